@@ -1,7 +1,13 @@
 import pygame
-import random
 import sys
 
+import text_cache
+from assets import AssetManager
+from entities import EntityStore, ASTEROID, CRYSTAL
+from sprite_cache import SpriteCache
+from fixed_loop import FixedStepLoop, lerp
+import profiler
+
 pygame.init()
 
 # --- WINDOW ---
@@ -9,23 +15,54 @@ WIDTH, HEIGHT = 600, 800
 WIN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Space Scavenger")
 
-# --- LOAD RESOURCES ---
-spaceship_img = pygame.image.load("spaceship.png")
-asteroid_img = pygame.image.load("asteroid.png")
-crystal_img = pygame.image.load("energy_crystal.png")
+# --- LOAD RESOURCES (background thread + disk cache, converted, resized for gameplay) ---
+assets = AssetManager()
+assets.image("spaceship", "spaceship.png", (80, 80))
+assets.image("asteroid", "asteroid.png")
+assets.image("crystal", "energy_crystal.png", (60, 60))
+assets.sound("clash", "clash_sound.wav")     # collision effect
+assets.start()
+
+
+def draw_loading_screen(progress):
+    WIN.fill((10, 10, 25))
+    text = text_cache.render("Arial", 28, "Loading...", (255, 255, 120))
+    WIN.blit(text, (WIDTH / 2 - text.get_width() / 2, HEIGHT / 2 - 40))
+    pygame.draw.rect(WIN, (60, 60, 90), (WIDTH / 4, HEIGHT / 2, WIDTH / 2, 12), 1)
+    pygame.draw.rect(WIN, (255, 255, 120), (WIDTH / 4, HEIGHT / 2, WIDTH / 2 * progress, 12))
+    pygame.display.update()
+
 
-# Resize for gameplay
-spaceship_img = pygame.transform.scale(spaceship_img, (80, 80))
-crystal_img = pygame.transform.scale(crystal_img, (60, 60))
+# Loading screen until the worker is done (the window keeps answering meanwhile)
+while not assets.wait(1 / 30):
+    if pygame.event.peek(pygame.QUIT):
+        pygame.quit()
+        sys.exit()
+    draw_loading_screen(assets.progress)
+assets.finish()
 
-# Sounds
-pygame.mixer.music.load("background_music.wav")   # background music
-clash_sound = pygame.mixer.Sound("clash_sound.wav")     # collision effect
+sprites = SpriteCache(quantum=6)
+spaceship_img = sprites.add("spaceship", assets["spaceship"])
+asteroid_img = sprites.add("asteroid", assets["asteroid"])
+crystal_img = sprites.add("crystal", assets["crystal"])
+clash_sound = assets["clash"]
+
+# Asteroids come in quantized sizes between 60 and 120, all scaled (and masked) up front
+ASTEROID_MIN_SIZE, ASTEROID_MAX_SIZE = 60, 120
+sprites.prescale("asteroid", ASTEROID_MIN_SIZE, ASTEROID_MAX_SIZE, masks=True)
+
+# Background music streams from disk, so it starts once loading is done
+pygame.mixer.music.load("background_music.wav")
 pygame.mixer.music.play(-1)
 
 # --- GAME VARIABLES ---
 clock = pygame.time.Clock()
-font = pygame.font.SysFont("Arial", 28)
+FPS = 60
+TICK_RATE = 60  # logic ticks per second; speeds below are per tick
+
+# Logic runs in fixed ticks independent of render FPS; its RNG is seedable (GAME_SEED)
+loop = FixedStepLoop(TICK_RATE)
+rng = loop.rng
 
 player_speed = 6
 asteroid_speed = 4
@@ -34,33 +71,52 @@ game_over = False
 
 # --- PLAYER ---
 player = spaceship_img.get_rect(center=(WIDTH // 2, HEIGHT - 100))
+player_mask = sprites.mask(spaceship_img)
+player_prev_x = player.x
+
+
+# --- ENTITIES (asteroids and crystals, one array-backed store) ---
+entities = EntityStore()
+# Asteroids only hit where their pixels touch the ship (not their transparent corners);
+# crystals keep the more forgiving rect pickup
+entities.set_collision(ASTEROID, sprites.mask)
 
 
 # --- CREATE ASTEROID ---
 def create_asteroid():
-    size = random.randint(60, 120)
-    img = pygame.transform.scale(asteroid_img, (size, size))
-    rect = img.get_rect(midtop=(random.randint(50, WIDTH - 50), -size))
-    return img, rect, size
+    size = sprites.quantize(rng.randint(ASTEROID_MIN_SIZE, ASTEROID_MAX_SIZE))
+    img = sprites.get("asteroid", size)
+    rect = img.get_rect(midtop=(rng.randint(50, WIDTH - 50), -size))
+    return entities.spawn(ASTEROID, rect, vy=asteroid_speed, sprite=img)
 
 
 # --- CREATE CRYSTAL ---
 def create_crystal():
-    rect = crystal_img.get_rect(midtop=(random.randint(40, WIDTH - 40), -60))
-    return rect
+    rect = crystal_img.get_rect(midtop=(rng.randint(40, WIDTH - 40), -60))
+    return entities.spawn(CRYSTAL, rect, vy=4, sprite=crystal_img)
 
 
-asteroids = []
-crystals = []
-
 ASTEROID_EVENT = pygame.USEREVENT + 1
 CRYSTAL_EVENT = pygame.USEREVENT + 2
-pygame.time.set_timer(ASTEROID_EVENT, 1200)
-pygame.time.set_timer(CRYSTAL_EVENT, 2500)
+loop.set_timer(ASTEROID_EVENT, 1200)
+loop.set_timer(CRYSTAL_EVENT, 2500)
+
+prof = profiler.create("space_scavenger")  # F3: frame-time overlay, F4: CSV dump
+
+
+def sprite_stats():
+    # F3 overlay line: the sprite cache stays at a fixed number of surfaces however long the game runs
+    s = sprites.stats()
+    return f"{s['hit_rate']:6.1%} hit {s['scaled']:>3} sz {s['bytes'] // 1024:>5} KB"
+
+
+prof.add_stats("sprites", sprite_stats)
 
 # MAIN LOOP
 while True:
+    prof.begin_frame()
     for event in pygame.event.get():
+        prof.handle_event(event)
         if event.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
@@ -68,23 +124,28 @@ while True:
         if game_over and event.type == pygame.KEYDOWN:
             if event.key == pygame.K_r:
                 # Restart
-                asteroids.clear()
-                crystals.clear()
+                entities.clear()
                 score = 0
                 player_speed = 6
                 asteroid_speed = 4
                 game_over = False
 
-        if event.type == ASTEROID_EVENT and not game_over:
-            asteroids.append(create_asteroid())
+    keys = pygame.key.get_pressed()
+    prof.mark("input")
 
-        if event.type == CRYSTAL_EVENT and not game_over:
-            crystals.append(create_crystal())
+    for _ in range(loop.advance(clock.get_time())):
+        # Spawn timers run in simulated time
+        for timer in loop.fired_timers():
+            if timer == ASTEROID_EVENT and not game_over:
+                create_asteroid()
+            if timer == CRYSTAL_EVENT and not game_over:
+                create_crystal()
 
-    keys = pygame.key.get_pressed()
+        if game_over:
+            continue
 
-    if not game_over:
         # Player movement
+        player_prev_x = player.x
         if keys[pygame.K_LEFT] and player.left > 0:
             player.x -= player_speed
         if keys[pygame.K_RIGHT] and player.right < WIDTH:
@@ -94,50 +155,45 @@ while True:
         asteroid_speed += 0.002
         player_speed += 0.001
 
-        # MOVE ASTEROIDS
-        for asteroid in asteroids[:]:
-            img, rect, size = asteroid
-            rect.y += asteroid_speed
-
-            # Collide with player
-            if rect.colliderect(player):
-                clash_sound.play()
-                game_over = True
+        # MOVE ASTEROIDS AND CRYSTALS
+        entities.set_velocity(ASTEROID, 0, asteroid_speed)
+        entities.move()
+        entities.cull(-WIDTH, -HEIGHT, 2 * WIDTH, HEIGHT)
 
-            if rect.top > HEIGHT:
-                asteroids.remove(asteroid)
+        # Collide with player
+        if len(entities.colliding(player, ASTEROID, player_mask)):
+            clash_sound.play()
+            game_over = True
 
-        # MOVE CRYSTALS
-        for c in crystals[:]:
-            c.y += 4
+        # Collect
+        collected = entities.colliding(player, CRYSTAL)
+        score += len(collected)
+        entities.remove(collected)
 
-            # Collect
-            if c.colliderect(player):
-                score += 1
-                crystals.remove(c)
-
-            if c.top > HEIGHT:
-                crystals.remove(c)
+    prof.mark("update")
 
     # DRAW
     WIN.fill((10, 10, 25))
 
-    # Draw objects
-    for img, rect, size in asteroids:
-        WIN.blit(img, rect)
-    for c in crystals:
-        WIN.blit(crystal_img, c)
+    # Draw objects, interpolated between the last two ticks
+    alpha = 1.0 if game_over else loop.alpha
+    WIN.blits(entities.blit_list(ASTEROID, alpha), doreturn=False)
+    WIN.blits(entities.blit_list(CRYSTAL, alpha), doreturn=False)
 
-    WIN.blit(spaceship_img, player)
+    WIN.blit(spaceship_img, (lerp(player_prev_x, player.x, alpha), player.y))
 
     # Score
-    score_text = font.render(f"Score: {score}", True, (255, 255, 120))
+    score_text = text_cache.render("Arial", 28, f"Score: {score}", (255, 255, 120))
     WIN.blit(score_text, (10, 10))
 
     # Game Over
     if game_over:
-        over_text = font.render("GAME OVER — Press R to Restart", True, (255, 80, 80))
+        over_text = text_cache.render("Arial", 28, "GAME OVER — Press R to Restart", (255, 80, 80))
         WIN.blit(over_text, (WIDTH / 2 - over_text.get_width() / 2, HEIGHT / 2))
 
+    prof.draw_overlay(WIN)
+    prof.mark("draw")
+
     pygame.display.update()
-    clock.tick(60)
+    prof.mark("display")
+    clock.tick(FPS)
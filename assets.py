@@ -0,0 +1,242 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import pygame
+
+# Background asset loading with an on-disk cache of decoded assets.
+# Images and sounds queued on an AssetManager are decoded on a worker thread
+# while the game draws a loading screen; finish() then converts the images
+# to the display format on the main thread (SDL wants that there).
+# Decoded (and already resized) images are cached as raw RGBA and sounds as
+# raw mixer samples, so later launches skip PNG/WAV decoding and scaling.
+# A cache entry is keyed on the source path, its size and mtime, the target
+# size and the mixer format, so editing an asset or the game refreshes it.
+
+CACHE_DIR = os.environ.get("GAME_ASSET_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".asset_cache"))
+CACHE_VERSION = 1
+IMAGE_HEADER = struct.Struct("<4sII")  # magic, width, height
+IMAGE_MAGIC = b"RGBA"
+
+
+def cache_key(path, *params):
+    st = os.stat(path)
+    key = f"{CACHE_VERSION}|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{params}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class AssetManager:
+    def __init__(self, cache_dir=CACHE_DIR, use_cache=True):
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.jobs = []
+        self.assets = {}
+        self.errors = []
+        self.done = 0
+        self.hits = 0
+        self.misses = 0
+        self.thread = None
+
+    def image(self, name, path, size=None):
+        self.jobs.append((self._load_image, name, path, size))
+
+    def sound(self, name, path):
+        self.jobs.append((self._load_sound, name, path, None))
+
+    # --- loading ---
+
+    def start(self):
+        self.thread = threading.Thread(target=self._load_all, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def _load_all(self):
+        for load, name, path, size in self.jobs:
+            try:
+                self.assets[name] = load(path, size)
+            except Exception as e:
+                self.errors.append(e)
+            self.done += 1
+
+    @property
+    def progress(self):
+        return self.done / len(self.jobs) if self.jobs else 1.0
+
+    def ready(self):
+        return self.thread is None or not self.thread.is_alive()
+
+    def wait(self, timeout=None):
+        # blocks the caller for at most timeout seconds; a loading screen calls this once per frame
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self.ready()
+
+    def finish(self):
+        # on the main thread once ready(): re-raise load errors, convert images for fast blits
+        if self.thread is None:
+            self._load_all()
+        self.wait()
+        if self.errors:
+            raise self.errors[0]
+        if pygame.display.get_surface() is not None:
+            for name, asset in self.assets.items():
+                if isinstance(asset, pygame.Surface):
+                    self.assets[name] = asset.convert_alpha()
+        return self.assets
+
+    def __getitem__(self, name):
+        return self.assets[name]
+
+    # --- cache ---
+
+    def _cache_path(self, key, ext):
+        return os.path.join(self.cache_dir, key + ext)
+
+    def _read_cache(self, path):
+        if not self.use_cache:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self.hits += 1
+        return data
+
+    def _write_cache(self, path, data):
+        if not self.use_cache:
+            return
+        self.misses += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # a read-only install just runs without the cache
+
+    def _load_image(self, path, size):
+        cached = self._cache_path(cache_key(path, size), ".rgba")
+        data = self._read_cache(cached)
+        if data is not None:
+            magic, w, h = IMAGE_HEADER.unpack_from(data)
+            if magic == IMAGE_MAGIC and len(data) == IMAGE_HEADER.size + w * h * 4:
+                return pygame.image.frombuffer(memoryview(data)[IMAGE_HEADER.size:], (w, h), "RGBA")
+            self.hits -= 1
+
+        img = pygame.image.load(path)
+        if size is not None:
+            img = pygame.transform.scale(img, size)
+        w, h = img.get_size()
+        self._write_cache(cached, IMAGE_HEADER.pack(IMAGE_MAGIC, w, h) + pygame.image.tobytes(img, "RGBA"))
+        return img
+
+    def _load_sound(self, path, size):
+        cached = self._cache_path(cache_key(path, pygame.mixer.get_init()), ".pcm")
+        data = self._read_cache(cached)
+        if data is not None:
+            return pygame.mixer.Sound(buffer=data)
+        sound = pygame.mixer.Sound(path)
+        self._write_cache(cached, sound.get_raw())
+        return sound
+
+
+# ------------------------------------------------------
+# python assets.py [image.png[:WxH] | sound.wav ...] : startup benchmark
+# ------------------------------------------------------
+
+SPACE_SCAVENGER_ASSETS = ("spaceship.png:80x80", "asteroid.png", "energy_crystal.png:60x60", "clash_sound.wav")
+
+
+def parse_spec(spec):
+    path, _, size = spec.partition(":")
+    return path, tuple(int(v) for v in size.split("x")) if size else None
+
+
+def make_stand_ins(specs, folder):
+    # noisy 1024x1024 PNGs and 2 s WAVs, for when the real assets are not around
+    import wave
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    paths = []
+    for spec in specs:
+        path, size = parse_spec(spec)
+        out = os.path.join(folder, os.path.basename(path))
+        if path.endswith(".wav"):
+            with wave.open(out, "wb") as w:
+                w.setnchannels(2)
+                w.setsampwidth(2)
+                w.setframerate(44100)
+                w.writeframes(rng.integers(-3000, 3000, 2 * 44100 * 2, dtype=np.int16).tobytes())
+        else:
+            pixels = rng.integers(0, 256, (1024, 1024, 4), dtype=np.uint8)
+            pygame.image.save(pygame.image.frombuffer(pixels.tobytes(), (1024, 1024), "RGBA"), out)
+        paths.append(out + (f":{size[0]}x{size[1]}" if size else ""))
+    return paths
+
+
+def benchmark(specs, runs=5):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((600, 800))
+    workdir = tempfile.mkdtemp(prefix="assets-bench-")
+    if not all(os.path.exists(parse_spec(s)[0]) for s in specs):
+        print("assets not found, benchmarking generated stand-ins")
+        specs = make_stand_ins(specs, workdir)
+    cache_dir = os.path.join(workdir, "cache")
+
+    def load():
+        manager = AssetManager(cache_dir)
+        for spec in specs:
+            path, size = parse_spec(spec)
+            name = os.path.basename(path)
+            if path.endswith(".wav"):
+                manager.sound(name, path)
+            else:
+                manager.image(name, path, size)
+        manager.start()
+        while not manager.wait(1 / 60):
+            pass  # a loading-screen frame would be drawn here
+        manager.finish()
+
+    def timed(fn):
+        best = float("inf")
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    def synchronous():
+        # what SpaceScavenger did before: decode, convert and scale on the main thread
+        for spec in specs:
+            path, size = parse_spec(spec)
+            if path.endswith(".wav"):
+                pygame.mixer.Sound(path)
+            else:
+                img = pygame.image.load(path).convert_alpha()
+                if size:
+                    pygame.transform.scale(img, size)
+
+    def cold():
+        for f in os.listdir(cache_dir) if os.path.isdir(cache_dir) else ():
+            os.remove(os.path.join(cache_dir, f))
+        load()
+
+    sync_ms = timed(synchronous)
+    cold_ms = timed(cold)
+    warm_ms = timed(load)
+    print(f"synchronous load:      {sync_ms:8.1f} ms")
+    print(f"first launch (cold):   {cold_ms:8.1f} ms  (decode + write cache, off the main thread)")
+    print(f"later launches (warm): {warm_ms:8.1f} ms  ({sync_ms / warm_ms:.1f}x faster than synchronous)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1:] or SPACE_SCAVENGER_ASSETS)
@@ -0,0 +1,166 @@
+import numpy as np
+
+# Broad-phase collision helpers over coordinate columns (e.g. the NumPy
+# columns of entities.EntityStore): a uniform-grid spatial hash that answers
+# rect queries and object-vs-object candidate pairs, and swap_remove, the
+# O(1)-per-item removal that keeps a set of parallel columns dense.
+
+CELL_BIAS = 1 << 20  # keeps negative cell coordinates positive in the packed key
+
+
+def _cell_key(cx, cy):
+    return (cx + CELL_BIAS) * (CELL_BIAS * 2) + (cy + CELL_BIAS)
+
+
+# --- SPATIAL HASH ---
+class SpatialHash:
+    """
+    Uniform grid over axis-aligned boxes. build() indexes a whole batch of
+    boxes in a few array ops: every (cell, box) entry gets a packed cell key
+    and the entries are sorted by key, so each cell is a contiguous run.
+    query() and pairs() only return boxes that really overlap (the same test
+    as Rect.colliderect); the grid decides which ones get tested.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.clear()
+
+    def clear(self):
+        self.left = self.top = self.right = self.bottom = np.zeros(0)
+        self.ids = np.zeros(0, dtype=np.intp)
+        self.keys = np.zeros(0, dtype=np.int64)    # sorted cell key of every (cell, box) entry
+        self.boxes = np.zeros(0, dtype=np.intp)    # box of every entry
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell_range(self, left, top, right, bottom):
+        cs = self.cell_size
+        return (np.floor_divide(left, cs).astype(np.int64), np.floor_divide(right - 1, cs).astype(np.int64),
+                np.floor_divide(top, cs).astype(np.int64), np.floor_divide(bottom - 1, cs).astype(np.int64))
+
+    def build(self, x, y, w, h, ids=None):
+        # boxes as columns; ids are what query()/pairs() report for them (default 0..n-1)
+        self.left = np.asarray(x, dtype=np.float64)
+        self.top = np.asarray(y, dtype=np.float64)
+        self.right = self.left + w
+        self.bottom = self.top + h
+        n = len(self.left)
+        self.ids = np.arange(n) if ids is None else np.asarray(ids, dtype=np.intp)
+
+        x0, x1, y0, y1 = self._cell_range(self.left, self.top, self.right, self.bottom)
+        nx = np.maximum(x1 - x0 + 1, 0)
+        ny = np.maximum(y1 - y0 + 1, 0)
+        per = nx * ny  # empty boxes get no cells, like Rect.colliderect never matches them
+        box = np.repeat(np.arange(n), per)
+        k = np.arange(len(box)) - np.repeat(np.cumsum(per) - per, per)  # entry number within its box
+        keys = _cell_key(x0[box] + k % nx[box], y0[box] + k // nx[box])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.boxes = box[order]
+
+    def _overlapping(self, boxes, left, top, right, bottom):
+        return ((self.left[boxes] < right) & (self.right[boxes] > left)
+                & (self.top[boxes] < bottom) & (self.bottom[boxes] > top))
+
+    def query(self, rect):
+        # ids of the boxes overlapping rect, in ascending order
+        x0, x1, y0, y1 = (int(v) for v in self._cell_range(rect.left, rect.top, rect.right, rect.bottom))
+        if x1 < x0 or y1 < y0 or not len(self.keys):
+            return np.zeros(0, dtype=np.intp)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) >= len(self.keys):
+            boxes = np.arange(len(self.ids))  # rect covers more cells than there are entries
+        else:
+            cx, cy = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+            wanted = _cell_key(cx.ravel(), cy.ravel())
+            lo = np.searchsorted(self.keys, wanted, "left")
+            hi = np.searchsorted(self.keys, wanted, "right")
+            counts = hi - lo
+            entries = np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            boxes = np.unique(self.boxes[entries])
+        hit = self._overlapping(boxes, rect.left, rect.top, rect.right, rect.bottom)
+        return np.sort(self.ids[boxes[hit]])
+
+    def pairs(self):
+        # (a, b) id arrays of every overlapping pair of boxes, each pair once, a from the lower box
+        m = len(self.keys)
+        if m < 2:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        # every entry pairs with the entries after it in the same cell run
+        run_end = np.searchsorted(self.keys, self.keys, "right")
+        counts = run_end - np.arange(m) - 1
+        first = np.repeat(np.arange(m), counts)
+        second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+        a, b = self.boxes[first], self.boxes[second]
+        # boxes that share several cells meet once per shared cell
+        n = len(self.ids)
+        a, b = np.divmod(np.unique(np.minimum(a, b) * n + np.maximum(a, b)), n)
+        hit = self._overlapping(a, self.left[b], self.top[b], self.right[b], self.bottom[b])
+        return self.ids[a[hit]], self.ids[b[hit]]
+
+
+# --- POOLS ---
+def swap_remove(columns, count, indices):
+    """
+    Removes rows from the first count rows of parallel columns by moving rows
+    from the end into the holes: O(len(indices)) copying, order not kept.
+    Returns the new count; the rows past it are left as they were.
+    """
+    doomed = np.unique(np.asarray(indices, dtype=np.intp))
+    new_count = count - len(doomed)
+    holes = doomed[doomed < new_count]
+    movers = np.setdiff1d(np.arange(new_count, count), doomed, assume_unique=True)
+    for col in columns:
+        col[holes] = col[movers]
+    return new_count
+
+
+# --- BENCHMARK: python collision.py [boxes...] ---
+def benchmark(counts=(200, 1000, 5000), frames=20):
+    # "asteroid storm": boxes of 60-120 px, spread so the density stays that of
+    # 40 asteroids on SpaceScavenger's 600x800 window
+    import time
+
+    import pygame
+
+    rng = np.random.default_rng(0)
+    print(f"{'boxes':>6} {'build ms':>9} {'query ms':>9} {'pairs ms':>9} {'brute ms':>9} {'pairs':>7}")
+    for n in counts:
+        side = np.sqrt(600 * 800 * n / 40)
+        x = rng.integers(0, int(side * 0.75), n).astype(float)
+        y = rng.integers(0, int(side), n).astype(float)
+        size = rng.integers(60, 121, n).astype(float)
+        player = pygame.Rect(int(side * 0.375), int(side / 2), 80, 80)
+        grid = SpatialHash(128)
+
+        def timed(fn):
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                result = fn()
+            return (time.perf_counter() - t0) / frames * 1000, result
+
+        build_ms, _ = timed(lambda: grid.build(x, y, size, size))
+        query_ms, near = timed(lambda: grid.query(player))
+        pairs_ms, (a, b) = timed(grid.pairs)
+
+        def brute():
+            hit = ((x[:, None] < x + size) & (x[:, None] + size[:, None] > x)
+                   & (y[:, None] < y + size) & (y[:, None] + size[:, None] > y))
+            return np.nonzero(np.triu(hit, 1))
+        brute_ms, (ba, bb) = timed(brute)
+        order = np.lexsort((b, a))
+        assert np.array_equal(a[order], ba) and np.array_equal(b[order], bb)
+        touching = (x < player.right) & (x + size > player.left) & (y < player.bottom) & (y + size > player.top)
+        assert np.array_equal(near, np.flatnonzero(touching))
+
+        print(f"{n:>6} {build_ms:9.3f} {query_ms:9.3f} {pairs_ms:9.3f} {brute_ms:9.3f} {len(a):>7}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        benchmark([int(a) for a in sys.argv[1:]])
+    else:
+        benchmark()
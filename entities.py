@@ -0,0 +1,273 @@
+import numpy as np
+
+from collision import SpatialHash, swap_remove
+
+# Structure-of-arrays entity store: one NumPy column per field, so moving,
+# culling and colliding thousands of entities is a handful of array ops.
+# Built on collision.py: the first `count` rows are always live (removal is
+# swap_remove), and pairs() goes through a SpatialHash over the columns,
+# rebuilt on the first use after entities moved, spawned or died. A single
+# rect query reuses that grid while it is current; otherwise one vectorized
+# pass over the columns is cheaper than building a grid to answer it.
+# Kinds can opt into pixel-perfect collision: only the rect hits go on to a
+# pygame.mask overlap test.
+
+# --- KINDS ---
+ASTEROID = 0
+CRYSTAL = 1
+
+
+class EntityStore:
+    def __init__(self, capacity=256, cell_size=128):
+        self.count = 0
+        self.capacity = 0
+        self.x = np.zeros(0, dtype=np.float32)
+        self.y = np.zeros(0, dtype=np.float32)
+        self.w = np.zeros(0, dtype=np.float32)
+        self.h = np.zeros(0, dtype=np.float32)
+        self.vx = np.zeros(0, dtype=np.float32)
+        self.vy = np.zeros(0, dtype=np.float32)
+        self.prev_x = np.zeros(0, dtype=np.float32)  # position before the last move(), for interpolation
+        self.prev_y = np.zeros(0, dtype=np.float32)
+        self.kind = np.zeros(0, dtype=np.uint8)
+        self.sprite = np.empty(0, dtype=object)  # surface to blit, shared between entities
+        self.mask_of = {}  # kind -> function(sprite) -> pygame.mask.Mask, for pixel-perfect kinds
+        self.grid = SpatialHash(cell_size)
+        self._grid_stale = True
+        self._grow(capacity)
+
+    def _columns(self):
+        return ("x", "y", "w", "h", "vx", "vy", "prev_x", "prev_y", "kind", "sprite")
+
+    def _grow(self, capacity):
+        for name in self._columns():
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype) if old.dtype != object else np.empty(capacity, dtype=object)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self._columns())
+
+    def spawn(self, kind, rect, vx=0.0, vy=0.0, sprite=None):
+        if self.count == self.capacity:
+            self._grow(max(16, self.capacity * 2))
+        i = self.count
+        self.x[i], self.y[i], self.w[i], self.h[i] = rect.x, rect.y, rect.w, rect.h
+        self.prev_x[i], self.prev_y[i] = rect.x, rect.y
+        self.vx[i], self.vy[i] = vx, vy
+        self.kind[i] = kind
+        self.sprite[i] = sprite
+        self.count += 1
+        self._grid_stale = True
+        return i
+
+    def clear(self):
+        self.sprite[:self.count] = None
+        self.count = 0
+        self._grid_stale = True
+
+    def remove(self, indices):
+        # swap-remove: rows from the end fill the holes, so indices from before the call go stale
+        n = self.count
+        self.count = swap_remove([getattr(self, name) for name in self._columns()], n, indices)
+        self.sprite[self.count:n] = None
+        self._grid_stale = True
+
+    def set_velocity(self, kind, vx, vy):
+        n = self.count
+        mask = self.kind[:n] == kind
+        self.vx[:n][mask] = vx
+        self.vy[:n][mask] = vy
+
+    def move(self):
+        # coordinates step by whole pixels, like the pygame.Rect objects they replace:
+        # `rect.y += v` rounds the sum half away from zero (np.rint would round half to even)
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        for pos, vel in ((self.x[:n], self.vx[:n]), (self.y[:n], self.vy[:n])):
+            pos += vel
+            np.trunc(pos + np.copysign(0.5, pos), out=pos)
+        self._grid_stale = True
+
+    def cull(self, left, top, right, bottom):
+        # entities entirely outside the box are removed
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        outside = (x > right) | (x + self.w[:n] < left) | (y > bottom) | (y + self.h[:n] < top)
+        if outside.any():
+            self.remove(np.flatnonzero(outside))
+
+    def set_collision(self, kind, mask_of=None):
+        # mask_of(sprite) -> Mask (e.g. SpriteCache.mask) makes kind pixel-perfect; None goes back to rects
+        if mask_of is None:
+            self.mask_of.pop(kind, None)
+        else:
+            self.mask_of[kind] = mask_of
+
+    def broad_phase(self):
+        # the SpatialHash over the current entities (ids are store indices)
+        if self._grid_stale:
+            n = self.count
+            self.grid.build(self.x[:n], self.y[:n], self.w[:n], self.h[:n])
+            self._grid_stale = False
+        return self.grid
+
+    def colliding(self, rect, kind=None, mask=None):
+        # ascending indices of entities overlapping rect (same test as Rect.colliderect);
+        # with the mask of whatever rect belongs to, pixel-perfect kinds must also overlap it
+        if not self._grid_stale:
+            idx = self.grid.query(rect)
+        else:
+            n = self.count
+            x, y = self.x[:n], self.y[:n]
+            idx = np.flatnonzero((x < rect.right) & (x + self.w[:n] > rect.left)
+                                 & (y < rect.bottom) & (y + self.h[:n] > rect.top))
+        if kind is not None:
+            idx = idx[self.kind[idx] == kind]
+        if mask is None or not self.mask_of or not len(idx):
+            return idx
+
+        keep = []
+        for i in idx.tolist():
+            mask_of = self.mask_of.get(int(self.kind[i]))
+            offset = (int(self.x[i]) - rect.x, int(self.y[i]) - rect.y)
+            if mask_of is None or mask.overlap(mask_of(self.sprite[i]), offset):
+                keep.append(i)
+        return np.array(keep, dtype=np.intp)
+
+    def pairs(self, kind_a=None, kind_b=None):
+        # (a, b) index arrays of overlapping entity pairs, a of kind_a and b of kind_b when given
+        a, b = self.broad_phase().pairs()
+        if kind_a is None and kind_b is None:
+            return a, b
+        ka, kb = self.kind[a], self.kind[b]
+        want_a = np.ones(len(a), dtype=bool) if kind_a is None else ka == kind_a
+        want_b = np.ones(len(a), dtype=bool) if kind_b is None else kb == kind_b
+        flip_a = np.ones(len(a), dtype=bool) if kind_a is None else kb == kind_a
+        flip_b = np.ones(len(a), dtype=bool) if kind_b is None else ka == kind_b
+        straight = want_a & want_b
+        flipped = flip_a & flip_b & ~straight
+        return np.concatenate([a[straight], b[flipped]]), np.concatenate([b[straight], a[flipped]])
+
+    def blit_list(self, kind=None, alpha=1.0):
+        # (surface, (x, y)) pairs for Surface.blits, alpha of the way from the previous position
+        n = self.count
+        idx = np.arange(n) if kind is None else np.flatnonzero(self.kind[:n] == kind)
+        x, y = self.x[idx], self.y[idx]
+        if alpha != 1.0:
+            x = self.prev_x[idx] + (x - self.prev_x[idx]) * alpha
+            y = self.prev_y[idx] + (y - self.prev_y[idx]) * alpha
+        return list(zip(self.sprite[idx], zip(x.tolist(), y.tolist())))
+
+
+# --- BENCHMARK: python entities.py [entities] [frames] ---
+def benchmark(n=5000, frames=300):
+    import sys
+    import time
+    import pygame
+
+    rng = np.random.default_rng(0)
+    player = pygame.Rect(260, 700, 80, 80)
+    xs = rng.integers(0, 600, n).tolist()
+    ys = rng.integers(-800, 0, n).tolist()
+
+    # list of Rects, one Python loop per frame
+    rects = [pygame.Rect(x, y, 90, 90) for x, y in zip(xs, ys)]
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        for r in rects:
+            r.y += 4
+            r.colliderect(player)
+            if r.top > 800:
+                r.y = -90
+    list_time = (time.perf_counter() - t0) / frames
+
+    store = EntityStore(n)
+    for x, y in zip(xs, ys):
+        store.spawn(ASTEROID, pygame.Rect(x, y, 90, 90), vy=4)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        store.move()
+        store.colliding(player)
+        store.y[:store.count][store.y[:store.count] > 800] = -90
+    store_time = (time.perf_counter() - t0) / frames
+
+    # object-vs-object: every overlapping pair through the grid
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        store.move()
+        a, _ = store.pairs()
+        store.y[:store.count][store.y[:store.count] > 800] = -90
+    pairs_time = (time.perf_counter() - t0) / frames
+
+    list_bytes = sys.getsizeof(rects) + sum(sys.getsizeof(r) for r in rects)
+    print(f"{n} entities, {frames} frames")
+    print(f"  list of Rects: {list_time * 1000:.3f} ms/frame, ~{list_bytes / n:.0f} B/entity")
+    print(f"  EntityStore:   {store_time * 1000:.3f} ms/frame, {store.nbytes / store.capacity:.0f} B/entity")
+    print(f"  EntityStore.pairs(): {pairs_time * 1000:.3f} ms/frame, {len(a)} overlapping pairs")
+
+
+# --- BENCHMARK: python entities.py --masks [frames] ---
+def benchmark_masks(counts=(100, 1000, 5000, 20000), frames=50):
+    # round asteroids and a triangular ship, as SpaceScavenger's sprites roughly are
+    import time
+    import pygame
+    from sprite_cache import SpriteCache
+
+    sprites = SpriteCache(quantum=6)
+    rock = pygame.Surface((120, 120), pygame.SRCALPHA)
+    pygame.draw.circle(rock, (120, 110, 100), (60, 60), 60)
+    sprites.add("asteroid", rock)
+    sprites.prescale("asteroid", 60, 120, masks=True)
+    ship = pygame.Surface((80, 80), pygame.SRCALPHA)
+    pygame.draw.polygon(ship, (200, 200, 255), [(40, 0), (80, 80), (0, 80)])
+    sprites.add("ship", ship)
+    player = ship.get_rect(center=(300, 700))
+    player_mask = sprites.mask(ship)
+
+    rng = np.random.default_rng(0)
+    print(f"{frames} frames, entities spread over the 600x800 window")
+    print(f"{'entities':>8} {'rect ms':>9} {'mask ms':>9} {'naive ms':>9} {'rect hits':>10} {'mask hits':>10}")
+    for n in counts:
+        store = EntityStore(n)
+        for size, x, y in zip(rng.integers(60, 121, n).tolist(), rng.integers(-60, 600, n).tolist(),
+                              rng.integers(-120, 800, n).tolist()):
+            img = sprites.get("asteroid", size)
+            store.spawn(ASTEROID, img.get_rect(topleft=(x, y)), sprite=img)
+
+        def timed(fn):
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                result = fn()
+            return (time.perf_counter() - t0) / frames * 1000, result
+
+        store.set_collision(ASTEROID)
+        rect_ms, rect_hits = timed(lambda: store.colliding(player, ASTEROID, player_mask))
+        store.set_collision(ASTEROID, sprites.mask)
+        mask_ms, mask_hits = timed(lambda: store.colliding(player, ASTEROID, player_mask))
+
+        def naive():
+            # a mask overlap for every entity, no rect pre-filter
+            return [i for i in range(store.count)
+                    if player_mask.overlap(sprites.mask(store.sprite[i]),
+                                           (int(store.x[i]) - player.x, int(store.y[i]) - player.y))]
+        naive_ms, naive_hits = timed(naive)
+        assert naive_hits == mask_hits.tolist()
+
+        print(f"{n:>8} {rect_ms:9.3f} {mask_ms:9.3f} {naive_ms:9.3f} {len(rect_hits):>10} {len(mask_hits):>10}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--masks" in sys.argv:
+        benchmark_masks(frames=int(sys.argv[2]) if len(sys.argv) > 2 else 50)
+    else:
+        benchmark(*[int(a) for a in sys.argv[1:3]])
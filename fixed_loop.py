@@ -0,0 +1,67 @@
+import os
+import random
+
+# Fixed-timestep loop runner shared by the games.
+# Logic runs in fixed ticks fed by an accumulator of real frame time, so
+# simulation speed does not depend on render FPS; alpha is the fraction of a
+# tick left over, for interpolating the drawn positions between two ticks.
+
+TICK_RATE = 60
+MAX_STEPS = 5  # most ticks run in one frame before the backlog is dropped
+
+
+def resolve_seed(seed=None):
+    # an explicit seed wins, then the GAME_SEED environment variable, then a random one
+    if seed is None:
+        seed = os.environ.get("GAME_SEED")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    return int(seed)
+
+
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
+
+class FixedStepLoop:
+    def __init__(self, tick_rate=TICK_RATE, max_steps=MAX_STEPS, seed=None):
+        self.step_ms = 1000.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.timers = {}
+        self.seed = resolve_seed(seed)
+        self.rng = random.Random(self.seed)
+
+    def advance(self, dt_ms):
+        # number of logic ticks to run for a frame that took dt_ms
+        self.accumulator += dt_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator %= self.step_ms
+        else:
+            self.accumulator -= steps * self.step_ms
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step_ms
+
+    def set_timer(self, event_type, interval_ms):
+        # like pygame.time.set_timer, but counted in simulated time
+        if interval_ms <= 0:
+            self.timers.pop(event_type, None)
+        else:
+            self.timers[event_type] = [interval_ms, interval_ms]
+
+    def fired_timers(self):
+        # call once per logic tick; returns the timers that came due in it
+        due = []
+        for event_type, timer in self.timers.items():
+            timer[1] -= self.step_ms
+            if timer[1] <= 0:
+                timer[1] += timer[0]
+                due.append(event_type)
+        return due
@@ -1,5 +1,9 @@
 import pygame, sys, random
 
+import maze_gen
+import profiler
+import text_cache
+
 # --- CONFIG ---
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
@@ -8,6 +12,9 @@ GRID_COLS = 8
 GRID_ROWS = 6
 STATUS_BAR = 80
 FPS = 30
+TRAP_DENSITY = maze_gen.DEFAULT_DENSITY  # 5 стапици на 8x6
+
+LEVEL_PACK = None  # maze_gen.LevelPack кога играта е стартувана со --pack
 
 BLACK    = (0, 0, 0)
 GRAY     = (150,150,150)
@@ -27,54 +34,207 @@ def grid_origin():
     return (WINDOW_WIDTH - w)//2, STATUS_BAR + (WINDOW_HEIGHT - STATUS_BAR - h)//2
 
 def random_level():
-    # генерира случајни 5 стапици, S и E се фиксни
-    traps = set()
-    while len(traps) < 5:
-        r = random.randint(0, GRID_ROWS-1)
-        c = random.randint(0, GRID_COLS-1)
-        if (c,r) not in [(0,4), (7,1)]:   # да не бидат врз S или E
-            traps.add((c,r))
-    return traps
+    # решливо ниво: од вчитаниот пакет, или ново од генераторот (S и E се фиксни)
+    if LEVEL_PACK is not None:
+        return LEVEL_PACK[random.randrange(len(LEVEL_PACK))]
+    return maze_gen.generate_level(GRID_COLS, GRID_ROWS, TRAP_DENSITY, seed=random.getrandbits(32))
 
 # ------------------------------------------------------
 # DRAW
 # ------------------------------------------------------
 
-def draw_board(screen, player, traps, exitp, reveal):
-    screen.fill(BLACK)
+def cell_rect(c, r):
     gx, gy = grid_origin()
+    return pygame.Rect(gx + c*CELL_SIZE, gy + r*CELL_SIZE, CELL_SIZE, CELL_SIZE)
 
-    # статус бар
-    pygame.draw.rect(screen, DARKGRAY, (0, 0, WINDOW_WIDTH, STATUS_BAR))
-
-    for r in range(GRID_ROWS):
-        for c in range(GRID_COLS):
-            rect = pygame.Rect(gx + c*CELL_SIZE, gy + r*CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(screen, GRAY, rect)
-            pygame.draw.rect(screen, DARKGRAY, rect, 1)
-
-            # Exit
-            if (c, r) == exitp:
-                pygame.draw.rect(screen, BLUE, rect)
+def visible_cells():
+    # само ќелиите што паѓаат во прозорецот (под статус барот), важно за големи мапи
+    gx, gy = grid_origin()
+    cols = range(max(0, -gx // CELL_SIZE), min(GRID_COLS, (WINDOW_WIDTH - gx) // CELL_SIZE + 1))
+    rows = range(max(0, (STATUS_BAR - gy) // CELL_SIZE), min(GRID_ROWS, (WINDOW_HEIGHT - gy) // CELL_SIZE + 1))
+    return cols, rows
 
-            # Player
-            if (c, r) == tuple(player):
-                p_rect = pygame.Rect(rect.x+10, rect.y+10, CELL_SIZE-20, CELL_SIZE-20)
-                pygame.draw.rect(screen, GREEN, p_rect)
+def draw_grid(surface):
+    # статичниот дел од екранот: статус бар и празна мрежа (не зависи од нивото)
+    surface.fill(BLACK)
 
-            # Reveal traps (only during the first 4 seconds)
-            if reveal and (c, r) in traps:
-                pygame.draw.rect(screen, RED, rect)
+    # статус бар
+    pygame.draw.rect(surface, DARKGRAY, (0, 0, WINDOW_WIDTH, STATUS_BAR))
+
+    surface.set_clip((0, STATUS_BAR, WINDOW_WIDTH, WINDOW_HEIGHT - STATUS_BAR))
+    cols, rows = visible_cells()
+    for r in rows:
+        for c in cols:
+            rect = cell_rect(c, r)
+            pygame.draw.rect(surface, GRAY, rect)
+            pygame.draw.rect(surface, DARKGRAY, rect, 1)
+    surface.set_clip(None)
+
+def fill_cells(surface, cells, color):
+    # обои ги ќелиите (излез, стапици) што се гледаат во прозорецот
+    surface.set_clip((0, STATUS_BAR, WINDOW_WIDTH, WINDOW_HEIGHT - STATUS_BAR))
+    cols, rows = visible_cells()
+    for c, r in cells:
+        if c in cols and r in rows:
+            pygame.draw.rect(surface, color, cell_rect(c, r))
+    surface.set_clip(None)
+
+def draw_player(surface, player):
+    rect = cell_rect(player[0], player[1])
+    pygame.draw.rect(surface, GREEN, (rect.x+10, rect.y+10, CELL_SIZE-20, CELL_SIZE-20))
+
+class MazeRenderer:
+    """
+    Слоевит рендерер: празната мрежа се црта еднаш, а за секое ниво од неа се
+    прават два слоја (со излез, и со излез и стапици). Во секој кадар се
+    прецртуваат само ќелиите каде играчот бил/е и статус барот кога ќе се смени.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.grid = pygame.Surface(screen.get_size()).convert()
+        self.base = pygame.Surface(screen.get_size()).convert()
+        self.revealed = pygame.Surface(screen.get_size()).convert()
+        draw_grid(self.grid)
+        self.layer = None
+        self.player = None
+        self.status = None
+
+    def set_level(self, traps, exitp):
+        self.base.blit(self.grid, (0, 0))
+        fill_cells(self.base, [exitp], BLUE)
+        self.revealed.blit(self.base, (0, 0))
+        fill_cells(self.revealed, traps, RED)
+        self.invalidate()
+
+    def invalidate(self):
+        self.layer = None
+
+    def draw(self, player, reveal, msg, lives, moves):
+        # ги враќа правоаголниците што треба да се пратат на pygame.display.update
+        layer = self.revealed if reveal else self.base
+        player = tuple(player)
+        status = (msg, lives, moves)
+
+        if layer is not self.layer:
+            self.screen.blit(layer, (0, 0))
+            draw_player(self.screen, player)
+            draw_status(self.screen, msg, lives, moves)
+            self.layer, self.player, self.status = layer, player, status
+            return [self.screen.get_rect()]
+
+        rects = []
+        if player != self.player:
+            for cell in (self.player, player):
+                rect = cell_rect(cell[0], cell[1])
+                self.screen.blit(layer, rect, rect)
+                rects.append(rect)
+            draw_player(self.screen, player)
+            self.player = player
+
+        if status != self.status:
+            bar = pygame.Rect(0, 0, WINDOW_WIDTH, STATUS_BAR)
+            self.screen.blit(layer, bar, bar)
+            draw_status(self.screen, msg, lives, moves)
+            rects.append(bar)
+            self.status = status
+
+        return rects
 
 def draw_status(screen, msg, lives, moves):
-    text_font = pygame.font.Font("freesansbold.ttf", 26)
-    msg_surf = text_font.render(msg, True, WHITE)
-    lives_surf = text_font.render(f"Животи: {lives}   Потези: {moves}", True, WHITE)
+    msg_surf = text_cache.render("freesansbold.ttf", 26, msg, WHITE)
+    lives_surf = text_cache.render("freesansbold.ttf", 26, f"Животи: {lives}   Потези: {moves}", WHITE)
 
     screen.blit(msg_surf, (20, 20))
     screen.blit(lives_surf, (420, 20))
 
 
+# ------------------------------------------------------
+# GAME STATE
+# ------------------------------------------------------
+
+REVEAL_MS = 4000  # колку долго се гледаат стапиците
+END_MS = 2000     # колку долго стои пораката за крај / успех
+
+REVEAL, PLAY, DEAD, WON, NEXT_LEVEL = "REVEAL", "PLAY", "DEAD", "WON", "NEXT_LEVEL"
+
+class MazeGame:
+    """
+    Состојбите на партијата (REVEAL, PLAY, DEAD, WON, NEXT_LEVEL).
+    Рестарт и ново ниво се прават на место, со истиот прозорец и рендерер.
+    """
+
+    def __init__(self, renderer, now):
+        self.renderer = renderer
+        self.start, self.exitp = maze_gen.start_and_exit(GRID_COLS, GRID_ROWS)
+        self.reset(now)
+
+    def reset(self, now):
+        # нова партија: ново ниво, 3 животи, 0 потези
+        self.lives = 3
+        self.moves = 0
+        self.traps = random_level()
+        self.renderer.set_level(self.traps, self.exitp)
+        self.player = list(self.start)
+        self.enter(REVEAL, now, "Запамти ги стапиците!")
+
+    def enter(self, state, now, msg=None):
+        self.state = state
+        self.state_start = now
+        if msg is not None:
+            self.msg = msg
+
+    def update(self, now):
+        elapsed = now - self.state_start
+        if self.state == REVEAL and elapsed > REVEAL_MS:
+            self.enter(PLAY, now, "Почни да се движиш!")
+        elif self.state == DEAD and elapsed > END_MS:
+            self.reset(now)
+        elif self.state == WON and elapsed > END_MS:
+            self.enter(NEXT_LEVEL, now)
+        elif self.state == NEXT_LEVEL:
+            self.reset(now)
+
+    def handle_key(self, key, now):
+        if key == pygame.K_r:
+            self.reset(now)
+            return
+
+        if self.state != PLAY:
+            return
+
+        new_c, new_r = self.player
+
+        if key == pygame.K_UP:    new_r -= 1
+        if key == pygame.K_DOWN:  new_r += 1
+        if key == pygame.K_LEFT:  new_c -= 1
+        if key == pygame.K_RIGHT: new_c += 1
+
+        # CHECK BOUNDS
+        if not (0 <= new_c < GRID_COLS and 0 <= new_r < GRID_ROWS):
+            self.msg = "Не можеш таму!"
+            return
+
+        self.player = [new_c, new_r]
+        self.moves += 1
+
+        # TRAP HIT
+        if (new_c, new_r) in self.traps:
+            self.lives -= 1
+            self.msg = f"Удри во стапица! Преостанати животи: {self.lives}"
+            self.player = list(self.start)
+
+            if self.lives == 0:
+                self.enter(DEAD, now, "Играта заврши!")
+
+        # EXIT
+        if (new_c, new_r) == self.exitp:
+            self.enter(WON, now, "Успешно го завршивте нивото!")
+
+    def draw(self):
+        return self.renderer.draw(self.player, self.state == REVEAL, self.msg, self.lives, self.moves)
+
+
 # ------------------------------------------------------
 # MAIN GAME LOOP
 # ------------------------------------------------------
@@ -85,29 +245,21 @@ def main():
     pygame.display.set_caption("Trap Maze")
     clock = pygame.time.Clock()
 
-    start = (0,4)
-    exitp = (7,1)
-    traps = random_level()
-
-    player = list(start)
-    lives = 3
-    moves = 0
-
-    state = "REVEAL"
-    msg = "Запамти ги стапиците!"
-    reveal_start = pygame.time.get_ticks()
-    REVEAL_MS = 4000
+    game = MazeGame(MazeRenderer(screen), pygame.time.get_ticks())
+    prof = profiler.create("maze")  # F3: overlay со времиња по фази, F4: CSV
+    overlay_shown = False
 
     while True:
         clock.tick(FPS)
+        prof.begin_frame()
+        now = pygame.time.get_ticks()
 
-        # CHECK REVEAL END
-        if state == "REVEAL" and pygame.time.get_ticks() - reveal_start > REVEAL_MS:
-            state = "PLAY"
-            msg = "Почни да се движиш!"
+        # CHECK STATE TIMERS (крај на откривањето, пораки за крај/успех)
+        game.update(now)
 
         # INPUT
         for e in pygame.event.get():
+            prof.handle_event(e)
             if e.type == pygame.QUIT:
                 sys.exit()
             if e.type == pygame.KEYDOWN:
@@ -115,53 +267,60 @@ def main():
                 if e.key == pygame.K_ESCAPE:
                     sys.exit()
 
-                if e.key == pygame.K_r:
-                    main()
-
-                if state == "PLAY":
-                    new_c, new_r = player
-
-                    if e.key == pygame.K_UP:    new_r -= 1
-                    if e.key == pygame.K_DOWN:  new_r += 1
-                    if e.key == pygame.K_LEFT:  new_c -= 1
-                    if e.key == pygame.K_RIGHT: new_c += 1
-
-                    # CHECK BOUNDS
-                    if not (0 <= new_c < GRID_COLS and 0 <= new_r < GRID_ROWS):
-                        msg = "Не можеш таму!"
-                        continue
-
-                    player = [new_c, new_r]
-                    moves += 1
-
-                    # TRAP HIT
-                    if (new_c, new_r) in traps:
-                        lives -= 1
-                        msg = f"Удри во стапица! Преостанати животи: {lives}"
-                        player = list(start)
-
-                        if lives == 0:
-                            msg = "Играта заврши!"
-                            draw_board(screen, player, traps, exitp, False)
-                            draw_status(screen, msg, lives, moves)
-                            pygame.display.update()
-                            pygame.time.delay(2000)
-                            main()
-
-                    # EXIT
-                    if (new_c, new_r) == exitp:
-                        msg = "Успешно го завршивте нивото!"
-                        draw_board(screen, player, traps, exitp, False)
-                        draw_status(screen, msg, lives, moves)
-                        pygame.display.update()
-                        pygame.time.delay(2000)
-                        main()
-
-        # DRAW
-        draw_board(screen, player, traps, exitp, state == "REVEAL")
-        draw_status(screen, msg, lives, moves)
-        pygame.display.update()
+                game.handle_key(e.key, now)
+
+        prof.mark("input")
+
+        # DRAW (само променетите делови)
+        if overlay_shown and not prof.overlay:
+            game.renderer.invalidate()  # прецртај го она што го покриваше overlay-от
+        rects = game.draw()
+        overlay_rect = prof.draw_overlay(screen)
+        overlay_shown = overlay_rect is not None
+        if overlay_shown:
+            rects.append(overlay_rect)
+        prof.mark("draw")
+        pygame.display.update(rects)
+        prof.mark("display")
+
+
+def soak(restarts=100000):
+    # python maze.py --soak [N]: N рестарти низ сите состојби, меморијата треба да остане рамна
+    import tracemalloc
+
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    game = MazeGame(MazeRenderer(screen), 0)
+    now = 0
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(restarts):
+        now += REVEAL_MS + 1
+        game.update(now)                 # REVEAL -> PLAY
+        game.draw()
+        if i % 3 == 0:
+            game.handle_key(pygame.K_r, now)
+        else:
+            game.enter(DEAD if i % 3 == 1 else WON, now)
+            now += END_MS + 1
+            game.update(now)             # DEAD -> REVEAL, WON -> NEXT_LEVEL
+            game.update(now)             # NEXT_LEVEL -> REVEAL
+        game.draw()
+        if (i + 1) % (restarts // 10 or 1) == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"{i + 1:>7} рестарти: {(current - baseline) / 1024:8.1f} KB (врв {(peak - baseline) / 1024:.1f} KB)")
+    tracemalloc.stop()
+    pygame.quit()
 
 
 if __name__ == "__main__":
-    main()
+    # python maze.py --pack levels.pack  (пакетот се прави со maze_gen.py)
+    if "--pack" in sys.argv:
+        LEVEL_PACK = maze_gen.LevelPack(sys.argv[sys.argv.index("--pack") + 1])
+        GRID_COLS, GRID_ROWS = LEVEL_PACK.cols, LEVEL_PACK.rows
+    if "--soak" in sys.argv:
+        args = sys.argv[sys.argv.index("--soak") + 1:]
+        soak(int(args[0]) if args and args[0].isdigit() else 100000)
+    else:
+        main()
@@ -0,0 +1,231 @@
+import itertools
+import struct
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+# ------------------------------------------------------
+# Генератор на нивоа за Trap Maze
+# ------------------------------------------------------
+# Секое ниво е bool маска (rows, cols) со стапиците. Стапиците се ставаат
+# слободно (насекаде освен на S и E), а нерешливите нивоа се отфрлаат и се
+# генерираат одново: path_lengths пушта BFS низ целиот batch одеднаш (едно
+# ширење на достигнатите ќелии по чекор) и го враќа најкраткиот пат на секое
+# ниво. Многу нивоа одеднаш се генерираат векторизирано и се запишуваат во
+# пакет (header + битови по ниво) што играта го отвора со np.memmap.
+
+DEFAULT_DENSITY = 5 / 48  # 5 стапици на 8x6, како оригиналното random_level
+
+PACK_MAGIC = b"MAZEPACK"
+PACK_VERSION = 1
+# magic, version, cols, rows, start_c, start_r, exit_c, exit_r, count
+PACK_HEADER = struct.Struct("<8s7HI")
+
+
+def start_and_exit(cols, rows):
+    # S долу лево, E горе десно; на 8x6 тоа се (0,4) и (7,1)
+    start, exitp = (0, max(0, rows - 2)), (cols - 1, min(1, rows - 1))
+    if start == exitp:
+        raise ValueError(f"мрежа {cols}x{rows} е премала: S и E се во иста ќелија")
+    return start, exitp
+
+
+MAX_EMPTY_ROUNDS = 20  # рунди по ред без ниту едно решливо ниво пред да се откаже
+
+
+def trap_count(cols, rows, density):
+    # S и E никогаш не се стапици
+    return max(0, min(int(round(density * cols * rows)), cols * rows - 2))
+
+
+def place_traps(n, cols, rows, density, rng):
+    # n случајни маски со trap_count стапици насекаде освен на S и E (може и нерешливи)
+    (sc, sr), (ec, er) = start_and_exit(cols, rows)
+    cells = cols * rows
+    k = trap_count(cols, rows, density)
+    keys = rng.random((n, cells))
+    keys[:, [sr * cols + sc, er * cols + ec]] = 2.0
+    traps = np.zeros((n, cells), dtype=bool)
+    if k:
+        chosen = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        traps[np.arange(n)[:, None], chosen] = True
+    return traps.reshape(n, rows, cols)
+
+
+def path_lengths(masks, start, exitp):
+    """
+    Најкраток безбеден пат од S до E (број потези) за секое ниво во masks
+    (n, rows, cols), -1 ако нема пат. BFS за сите нивоа одеднаш: во секој
+    чекор достигнатото множество се шири за една ќелия во четирите насоки,
+    а нивоата што се готови (E достигнат или нема каде) испаѓаат од batch-от.
+    """
+    n = len(masks)
+    (sc, sr), (ec, er) = start, exitp
+    dist = np.full(n, -1, dtype=np.int64)
+    free = ~masks
+    reached = np.zeros_like(free)
+    reached[:, sr, sc] = free[:, sr, sc]
+    frontier = reached.copy()
+    dist[reached[:, er, ec]] = 0
+    rows = np.flatnonzero(reached[:, sr, sc] & (dist < 0))  # нивоа во кои BFS сè уште тече
+    free, reached, frontier = free[rows], reached[rows], frontier[rows]
+
+    step = 0
+    while len(rows):
+        step += 1
+        grow = np.zeros_like(frontier)
+        grow[:, 1:, :] |= frontier[:, :-1, :]
+        grow[:, :-1, :] |= frontier[:, 1:, :]
+        grow[:, :, 1:] |= frontier[:, :, :-1]
+        grow[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = grow & free & ~reached
+        reached |= frontier
+        done = frontier[:, er, ec]
+        dist[rows[done]] = step
+        going = ~done & frontier.any(axis=(1, 2))
+        if not going.all():
+            rows, free, reached, frontier = rows[going], free[going], reached[going], frontier[going]
+    return dist
+
+
+def generate_batch(n, cols, rows, density=DEFAULT_DENSITY, seed=None):
+    """
+    Враќа bool низа (n, rows, cols) со стапиците на n решливи нивоа.
+    seed може да биде и np.random.Generator.
+    """
+    rng = np.random.default_rng(seed)
+    start, exitp = start_and_exit(cols, rows)
+    levels = np.empty((n, rows, cols), dtype=bool)
+    filled = empty_rounds = 0
+    while filled < n:
+        masks = place_traps(n - filled, cols, rows, density, rng)
+        good = masks[path_lengths(masks, start, exitp) >= 0]
+        levels[filled:filled + len(good)] = good
+        filled += len(good)
+        empty_rounds = 0 if len(good) else empty_rounds + 1
+        if empty_rounds == MAX_EMPTY_ROUNDS:
+            raise ValueError(f"густина {density:.2f} на {cols}x{rows}: скоро ниту едно ниво не е решливо")
+    return levels
+
+
+def generate_level(cols, rows, density=DEFAULT_DENSITY, seed=None):
+    # едно ниво како множество (c, r), формат што го користи maze.py
+    return mask_to_traps(generate_batch(1, cols, rows, density, seed)[0])
+
+
+def mask_to_traps(mask):
+    rs, cs = np.nonzero(mask)
+    return set(zip(cs.tolist(), rs.tolist()))
+
+
+def is_solvable(mask, start, exitp):
+    # BFS од S до E низ ќелии без стапица
+    rows, cols = mask.shape
+    if mask[start[1], start[0]] or mask[exitp[1], exitp[0]]:
+        return False
+    seen = np.zeros_like(mask, dtype=bool)
+    seen[start[1], start[0]] = True
+    queue = deque([start])
+    while queue:
+        c, r = queue.popleft()
+        if (c, r) == exitp:
+            return True
+        for nc, nr in ((c + 1, r), (c - 1, r), (c, r + 1), (c, r - 1)):
+            if 0 <= nc < cols and 0 <= nr < rows and not seen[nr, nc] and not mask[nr, nc]:
+                seen[nr, nc] = True
+                queue.append((nc, nr))
+    return False
+
+
+# ------------------------------------------------------
+# Пакет со нивоа на диск
+# ------------------------------------------------------
+
+def write_pack(path, cols, rows, batches):
+    # batches: итерабилно од маски (n, rows, cols); се запишуваат една по една
+    start, exitp = start_and_exit(cols, rows)
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None or not len(first):
+        raise ValueError(f"{path}: пакетот мора да има барем едно ниво")
+    count = 0
+    with open(path, "wb") as f:
+        f.write(b"\0" * PACK_HEADER.size)
+        for masks in itertools.chain([first], batches):
+            n = len(masks)
+            f.write(np.packbits(masks.reshape(n, rows * cols), axis=1).tobytes())
+            count += n
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, cols, rows, *start, *exitp, count))
+    return count
+
+
+def generate_batches(count, cols, rows, density=DEFAULT_DENSITY, seed=None, cells_per_batch=4_000_000):
+    # генерира count нивоа во делови, за меморијата да не расте со бројот на нивоа
+    rng = np.random.default_rng(seed)
+    per_batch = max(1, cells_per_batch // (cols * rows))
+    for first in range(0, count, per_batch):
+        yield generate_batch(min(per_batch, count - first), cols, rows, density, rng)
+
+
+class LevelPack:
+    """
+    Пакет со нивоа мапиран во меморија; ниво се декодира дури кога ќе се побара.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = PACK_HEADER.unpack(f.read(PACK_HEADER.size))
+        magic, version, self.cols, self.rows, sc, sr, ec, er, self.count = header
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f"{path}: не е пакет со нивоа (верзија {PACK_VERSION})")
+        if self.count == 0:
+            raise ValueError(f"{path}: празен пакет")
+        self.start = (sc, sr)
+        self.exitp = (ec, er)
+        row_bytes = (self.cols * self.rows + 7) // 8
+        self.bits = np.memmap(path, dtype=np.uint8, mode="r", offset=PACK_HEADER.size,
+                              shape=(self.count, row_bytes))
+
+    def __len__(self):
+        return self.count
+
+    def mask(self, i):
+        cells = self.cols * self.rows
+        return np.unpackbits(self.bits[i])[:cells].astype(bool).reshape(self.rows, self.cols)
+
+    def __getitem__(self, i):
+        return mask_to_traps(self.mask(i))
+
+
+# ------------------------------------------------------
+# python maze_gen.py levels.pack [број] [cols] [rows] [густина] [seed]
+# ------------------------------------------------------
+
+def main(argv):
+    path = argv[0] if argv else "levels.pack"
+    count = int(argv[1]) if len(argv) > 1 else 100000
+    cols = int(argv[2]) if len(argv) > 2 else 8
+    rows = int(argv[3]) if len(argv) > 3 else 6
+    density = float(argv[4]) if len(argv) > 4 else DEFAULT_DENSITY
+    seed = int(argv[5]) if len(argv) > 5 else None
+
+    t0 = time.perf_counter()
+    write_pack(path, cols, rows, generate_batches(count, cols, rows, density, seed))
+    elapsed = time.perf_counter() - t0
+    print(f"{count} нивоа {cols}x{rows}, {trap_count(cols, rows, density)} стапици: "
+          f"{elapsed:.3f}s ({count / elapsed:,.0f} нивоа/s) -> {path}")
+
+    pack = LevelPack(path)
+    start, exitp = pack.start, pack.exitp
+    sample = range(0, len(pack), max(1, len(pack) // 1000))
+    assert all(is_solvable(pack.mask(i), start, exitp) for i in sample)
+    par = path_lengths(np.stack([pack.mask(i) for i in sample]), start, exitp)
+    print(f"проверени {len(sample)} нивоа со BFS: сите решливи, најкраток пат "
+          f"мин {par.min()}, просек {par.mean():.2f}, макс {par.max()}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,170 @@
+import csv
+import heapq
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import maze_gen
+
+# ------------------------------------------------------
+# Решавач и автоматски играч за Trap Maze
+# ------------------------------------------------------
+# Ниво = битсет од стапиците во ист формат како во пакетот (np.packbits по
+# редови, ќелија i = r*cols + c), па нивоата од LevelPack се решаваат
+# директно од memmap. A* работи над низи по ќелија (цена, претходник,
+# затворени) наместо над речници; на 200x200 тоа е побрзо и од
+# maze_gen.path_lengths (BFS над многу нивоа одеднаш), што останува за
+# генераторот.
+
+LIVES = 3  # исто како во maze.MazeGame.reset
+
+
+def to_bitset(mask):
+    # bool маска (rows, cols) -> битсет (bytes)
+    return np.packbits(mask.ravel()).tobytes()
+
+
+def to_cells(bits, cells):
+    # битсет -> bytearray со по еден бајт по ќелија (1 = стапица)
+    return bytearray(np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=cells).tobytes())
+
+
+def astar(bits, cols, rows, start, goal):
+    """
+    Најкраток безбеден пат од start до goal (A*, Manhattan хевристика).
+    Враќа листа од ќелии (c, r) без start, или None ако нема пат.
+    """
+    return astar_cells(to_cells(bits, cols * rows), cols, rows, start, goal)
+
+
+def astar_cells(blocked, cols, rows, start, goal):
+    # A* над blocked (бајт по ќелија). При еднаков f прво оди подлабоко (поголемо g),
+    # па на отворена мрежа не ги отвора сите ќелии во правоаголникот меѓу S и E
+    cells = cols * rows
+    s = start[1] * cols + start[0]
+    g = goal[1] * cols + goal[0]
+    if blocked[s] or blocked[g]:
+        return None
+    gc, gr = goal
+
+    cost = [cells] * cells  # cells е подолго од секој пат
+    came_from = [-1] * cells
+    closed = bytearray(cells)
+    cost[s] = 0
+    heap = [(abs(start[0] - gc) + abs(start[1] - gr), 0, s)]
+    while heap:
+        _, neg_d, cur = heapq.heappop(heap)
+        if cur == g:
+            path = []
+            while cur != s:
+                path.append((cur % cols, cur // cols))
+                cur = came_from[cur]
+            path.reverse()
+            return path
+        if closed[cur]:
+            continue
+        closed[cur] = 1
+        d = 1 - neg_d
+        c, r = cur % cols, cur // cols
+        for nxt, inside in ((cur + 1, c + 1 < cols), (cur - 1, c > 0), (cur + cols, r + 1 < rows), (cur - cols, r > 0)):
+            if inside and d < cost[nxt] and not blocked[nxt]:
+                cost[nxt] = d
+                came_from[nxt] = cur
+                heapq.heappush(heap, (d + abs(nxt % cols - gc) + abs(nxt // cols - gr), -d, nxt))
+    return None
+
+
+def par_moves(bits, cols, rows, start, exitp):
+    # минимален број потези до излезот (-1 ако нивото е нерешливо)
+    path = astar(bits, cols, rows, start, exitp)
+    return -1 if path is None else len(path)
+
+
+def autoplay(bits, cols, rows, start, exitp, forget=0.0, rng=None):
+    """
+    Headless партија по правилата на maze.py (LIVES животи, удар во стапица
+    враќа на S). Играчот ја заборава секоја стапица со веројатност forget,
+    ја учи кога ќе удри во неа и повторно планира со A*.
+    Враќа (победа, потези, преостанати животи).
+    """
+    rng = rng or random.Random()
+    traps = to_cells(bits, cols * rows)
+    known = bytearray(len(traps))
+    for i in np.flatnonzero(np.frombuffer(traps, dtype=np.uint8)).tolist():
+        if rng.random() >= forget:
+            known[i] = 1
+
+    lives, moves = LIVES, 0
+    while True:
+        path = astar_cells(known, cols, rows, start, exitp)
+        if path is None:
+            return False, moves, lives
+        for c, r in path:
+            moves += 1
+            i = r * cols + c
+            if traps[i]:
+                lives -= 1
+                known[i] = 1
+                if lives == 0:
+                    return False, moves, lives
+                break
+            if (c, r) == exitp:
+                return True, moves, lives
+
+
+# ------------------------------------------------------
+# Паралелно решавање на пакет со нивоа
+# ------------------------------------------------------
+
+def _solve_range(path, first, last, forget, seed):
+    pack = maze_gen.LevelPack(path)
+    rng = random.Random(seed)
+    rows = []
+    for i in range(first, last):
+        bits = pack.bits[i].tobytes()
+        par = par_moves(bits, pack.cols, pack.rows, pack.start, pack.exitp)
+        won, moves, lives = autoplay(bits, pack.cols, pack.rows, pack.start, pack.exitp, forget, rng)
+        rows.append((i, par, int(won), moves, lives))
+    return rows
+
+
+def solve_pack(path, workers=None, forget=0.0, seed=0, chunk=2000):
+    # сите нивоа од пакетот, поделени на делови низ процеси; враќа листа (ниво, par, ...)
+    count = len(maze_gen.LevelPack(path))
+    ranges = [(first, min(first + chunk, count)) for first in range(0, count, chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_solve_range, path, a, b, forget, seed + a) for a, b in ranges]
+        return [row for f in futures for row in f.result()]
+
+
+# python maze_solver.py levels.pack [forget] [workers] [out.csv]
+def main(argv):
+    path = argv[0] if argv else "levels.pack"
+    forget = float(argv[1]) if len(argv) > 1 else 0.2
+    workers = int(argv[2]) if len(argv) > 2 else os.cpu_count()
+    out = argv[3] if len(argv) > 3 else os.path.splitext(path)[0] + "_par.csv"
+
+    t0 = time.perf_counter()
+    results = solve_pack(path, workers, forget)
+    elapsed = time.perf_counter() - t0
+
+    with open(out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("level", "par", "auto_won", "auto_moves", "auto_lives"))
+        writer.writerows(results)
+
+    par = np.array([r[1] for r in results])
+    won = np.array([r[2] for r in results])
+    print(f"{len(results)} нивоа за {elapsed:.2f}s ({len(results) / elapsed:,.0f} нивоа/s, {workers} процеси) -> {out}")
+    print(f"par: мин {par.min()}, просек {par.mean():.2f}, макс {par.max()}, нерешливи {(par < 0).sum()}")
+    print(f"автоплеер (заборава {forget:.0%}): победи {won.mean():.1%}")
+    hardest = sorted(results, key=lambda r: (r[2], -r[3]))[:5]
+    print("најтешки нивоа:", ", ".join(f"#{r[0]} (par {r[1]}, {r[3]} потези)" for r in hardest))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,23 +1,20 @@
 import pygame
-import random
 import sys
 
+import profiler
+import text_cache
+from fixed_loop import FixedStepLoop, lerp
+from pong_sim import (
+    PongSim, WINDOW_WIDTH, WINDOW_HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE,
+)
+
 # ---------------------------
 # Конфигурација
 # ---------------------------
-WINDOW_WIDTH = 800
-WINDOW_HEIGHT = 600
-FPS = 60
-
-# Paddle (лeва палка)
-PADDLE_WIDTH = 20
-PADDLE_HEIGHT = 120
-PADDLE_SPEED = 6
+FPS = 60        # рендерирање
+TICK_RATE = 60  # логички чекори во секунда (физиката е подесена на 60 чекори/s)
 
-# Ball
-BALL_SIZE = 18
-BALL_INITIAL_SPEED_X = 4.0  # почетна хоризонтална брзина (апсолутна вредност)
-BALL_INITIAL_SPEED_Y = 2.0  # почетна вертикална компонента
+# Геометријата и физиката (палка, топка, брзини) се во pong_sim.py
 
 # Бои
 BG_COLOR = (15, 15, 15)
@@ -26,49 +23,84 @@ BALL_COLOR = (240, 80, 80)
 TEXT_COLOR = (240, 240, 240)
 STATUS_COLOR = (200, 200, 0)
 
+WALL_COLOR = (100, 100, 100)
+WALL_WIDTH = 10
+
 # ---------------------------
 # Помошни функции
 # ---------------------------
 
-def reset_game():
+def banner(text, size, color, x, y, center=False):
+    # натпис што не се менува: површина и позиција, пресметани еднаш
+    surf = text_cache.render("Arial", size, text, color)
+    rect = surf.get_rect(center=(x, y)) if center else surf.get_rect(topleft=(x, y))
+    return surf, rect
+
+
+class PongView:
     """
-    Враќа почетни вредности за позицијата на палката, топката, брзините, поените и др.
+    Цртање на меч 0 од PongSim без нови објекти во секој кадар: Rect-овите за
+    палката, топката и ѕидот се прават еднаш и се менуваат на место, статичните
+    натписи (инструкции, пауза, крај на играта) се рендерираат однапред, а
+    поените и крајниот резултат само кога ќе се сменат.
     """
-    # Позиција на палка (лево центрирано вертикално)
-    paddle_x = 20
-    paddle_y = (WINDOW_HEIGHT - PADDLE_HEIGHT) // 2
-
-    # Топка во средина, ја даваме почетна насока кон лево или десно (посакувано: кон играчот)
-    ball_x = WINDOW_WIDTH // 2
-    ball_y = WINDOW_HEIGHT // 2
-
-    # Насока: да дојде кон палката (од десно кон лево), па vx треба да биде негативно
-    vx = -BALL_INITIAL_SPEED_X
-    vy = random.choice([-1, 1]) * BALL_INITIAL_SPEED_Y
-
-    score = 0
-    game_over = False
-
-    return {
-        "paddle_x": paddle_x,
-        "paddle_y": paddle_y,
-        "ball_x": float(ball_x),
-        "ball_y": float(ball_y),
-        "vx": vx,
-        "vy": vy,
-        "score": score,
-        "game_over": game_over
-    }
-
-def draw_text(surface, text, size, x, y, color=TEXT_COLOR, center=False):
-    font = pygame.font.SysFont("Arial", size)
-    surf = font.render(text, True, color)
-    rect = surf.get_rect()
-    if center:
-        rect.center = (x, y)
-    else:
-        rect.topleft = (x, y)
-    surface.blit(surf, rect)
+
+    __slots__ = (
+        "paddle_rect", "ball_rect", "wall_rect", "help", "pause", "game_over", "game_over_hint",
+        "score", "score_banner", "final_banner",
+    )
+
+    def __init__(self):
+        self.paddle_rect = pygame.Rect(0, 0, PADDLE_WIDTH, PADDLE_HEIGHT)
+        self.ball_rect = pygame.Rect(0, 0, BALL_SIZE, BALL_SIZE)
+        self.wall_rect = pygame.Rect(WINDOW_WIDTH - WALL_WIDTH, 0, WALL_WIDTH, WINDOW_HEIGHT)
+
+        self.help = banner("UP/DOWN: поместување на палката  |  P: пауза  |  R: рестарт  |  ESC: излез",
+                           18, STATUS_COLOR, 10, WINDOW_HEIGHT - 30)
+        self.pause = banner("ПАУЗА — притисни P за продолжување", 32, TEXT_COLOR,
+                            WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2, center=True)
+        self.game_over = banner("Играта заврши!", 48, TEXT_COLOR,
+                                WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 40, center=True)
+        self.game_over_hint = banner("Притисни R за повторно да започнеш или ESC за излез", 20, STATUS_COLOR,
+                                     WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 60, center=True)
+        self.score = None
+        self.score_banner = None
+        self.final_banner = None
+
+    def set_score(self, score):
+        if score != self.score:
+            self.score = score
+            self.score_banner = banner(f"Поени: {score}", 24, TEXT_COLOR, 10, 10)
+            self.final_banner = banner(f"Краен резултат: {score}", 32, TEXT_COLOR,
+                                       WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10, center=True)
+
+    def draw(self, screen, sim, alpha, paused):
+        # интерполирано помеѓу последните два чекори
+        self.paddle_rect.x = sim.paddle_x
+        self.paddle_rect.y = int(lerp(sim.prev_paddle_y[0], sim.paddle_y[0], alpha))
+        self.ball_rect.x = int(lerp(sim.prev_ball_x[0], sim.ball_x[0], alpha))
+        self.ball_rect.y = int(lerp(sim.prev_ball_y[0], sim.ball_y[0], alpha))
+        self.set_score(int(sim.score[0]))
+
+        screen.fill(BG_COLOR)
+
+        # Палка, десен зид (како ѕид), топка
+        pygame.draw.rect(screen, PADDLE_COLOR, self.paddle_rect)
+        pygame.draw.rect(screen, WALL_COLOR, self.wall_rect)
+        pygame.draw.rect(screen, BALL_COLOR, self.ball_rect)
+
+        # Информации: score, инструкции, pause/gameover
+        screen.blit(*self.score_banner)
+        screen.blit(*self.help)
+
+        if paused:
+            screen.blit(*self.pause)
+
+        if sim.game_over[0]:
+            screen.blit(*self.game_over)
+            screen.blit(*self.final_banner)
+            screen.blit(*self.game_over_hint)
+
 
 # ---------------------------
 # Главна функција
@@ -79,20 +111,22 @@ def main():
     pygame.display.set_caption("Pong - Lab Exercise")
     clock = pygame.time.Clock()
 
-    # Почетни вредности
-    state = reset_game()
+    # Почетни вредности: физиката живее во PongSim, овде го цртаме само меч 0.
+    # Логиката оди со фиксен чекор, независно од FPS на цртањето.
+    loop = FixedStepLoop(TICK_RATE)
+    sim = PongSim(1, seed=loop.seed)
+    view = PongView()
     paused = False
-
-    # За да избегнеме повеќекратно детектирање на брзи судири додека топката е „внатре“ во палката,
-    # користиме flag кој овозможува повторно судирање само откако топката ќе се "отстрани" малку.
-    can_collide_with_paddle = True
+    prof = profiler.create("pong")  # F3: overlay со времиња по фази, F4: CSV
 
     running = True
     while running:
         dt = clock.tick(FPS)
+        prof.begin_frame()
 
         # ------------ ЕВЕНТИ ------------
         for event in pygame.event.get():
+            prof.handle_event(event)
             if event.type == pygame.QUIT:
                 running = False
 
@@ -106,108 +140,76 @@ def main():
 
                 # Restart
                 if event.key == pygame.K_r:
-                    state = reset_game()
+                    sim.reset()
                     paused = False
-                    can_collide_with_paddle = True
 
-        # ------------ ЛОГИКА (ако не е паузирано и не е game over) ------------
+        # ------------ ЛОГИКА (ако не е паузирано; game over се проверува во симулацијата) ------------
+        prof.mark("input")
         keys = pygame.key.get_pressed()
-        if not paused and not state["game_over"]:
-            # Палка контрола (GORE / DOLU)
-            if keys[pygame.K_UP]:
-                state["paddle_y"] -= PADDLE_SPEED
-            if keys[pygame.K_DOWN]:
-                state["paddle_y"] += PADDLE_SPEED
-
-            # Ограничување на палката внатре во екран
-            if state["paddle_y"] < 0:
-                state["paddle_y"] = 0
-            if state["paddle_y"] > WINDOW_HEIGHT - PADDLE_HEIGHT:
-                state["paddle_y"] = WINDOW_HEIGHT - PADDLE_HEIGHT
-
-            # Поместување на топката
-            state["ball_x"] += state["vx"]
-            state["ball_y"] += state["vy"]
-
-            # Судир со горен и долен предел - промени насока по y
-            if state["ball_y"] <= 0:
-                state["ball_y"] = 0
-                state["vy"] = -state["vy"]
-            elif state["ball_y"] + BALL_SIZE >= WINDOW_HEIGHT:
-                state["ball_y"] = WINDOW_HEIGHT - BALL_SIZE
-                state["vy"] = -state["vy"]
-
-            # Судир со десниот зид - топката само се одбива (менува насока по x)
-            if state["ball_x"] + BALL_SIZE >= WINDOW_WIDTH:
-                state["ball_x"] = WINDOW_WIDTH - BALL_SIZE
-                state["vx"] = -state["vx"]
-
-            # Судир со палката (лево). Прво креираме Rects за collision detection
-            paddle_rect = pygame.Rect(state["paddle_x"], state["paddle_y"], PADDLE_WIDTH, PADDLE_HEIGHT)
-            ball_rect = pygame.Rect(int(state["ball_x"]), int(state["ball_y"]), BALL_SIZE, BALL_SIZE)
-
-            # Севкупно услов за судир: ball_rect intersects paddle_rect и топката се движи кон палката (vx < 0)
-            if ball_rect.colliderect(paddle_rect) and state["vx"] < 0 and can_collide_with_paddle:
-                # Поместуваме топката надвор од палката за да избегнеме повторни судири во истиот кадар
-                state["ball_x"] = state["paddle_x"] + PADDLE_WIDTH
-
-                # Реверзирај насока по x (одбивање) и малку зголеми брзина
-                # Зголемување на брзина: зголеми апсолутна вредност на vx за 8%
-                new_speed_x = abs(state["vx"]) * 1.08
-                state["vx"] = new_speed_x  # сега топката оди кон десно (позитивно)
-
-                # Додај мал случаен придонес во y-насока за да се менува патеката (од -2 до +2)
-                delta_vy = random.uniform(-2.0, 2.0)
-                state["vy"] += delta_vy
-
-                # Ограничување на вертикалната компонента за да не стане премногу голема
-                if state["vy"] > 8:
-                    state["vy"] = 8
-                if state["vy"] < -8:
-                    state["vy"] = -8
-
-                # Зголемување на поен
-                state["score"] += 1
-
-                # Одбивањето треба да забрани повторно судирање додека топката не се отдалечи
-                can_collide_with_paddle = False
-
-            # Ако топката се оддалечи доволно од палката во x-насока, дозволи повторно судирање
-            if state["ball_x"] > state["paddle_x"] + PADDLE_WIDTH + 5:
-                can_collide_with_paddle = True
-
-            # Проверка за Game Over: ако топката помине зад палката (на левата страна)
-            if state["ball_x"] + BALL_SIZE < 0:
-                state["game_over"] = True
+        steps = loop.advance(dt)
+        if not paused:
+            for _ in range(steps):
+                sim.step(keys[pygame.K_UP], keys[pygame.K_DOWN])
+
+        prof.mark("update")
 
         # ------------ ЦРТАЊЕ ------------
-        screen.fill(BG_COLOR)
+        view.draw(screen, sim, 1.0 if paused else loop.alpha, paused)
 
-        # Палка
-        pygame.draw.rect(screen, PADDLE_COLOR, (state["paddle_x"], state["paddle_y"], PADDLE_WIDTH, PADDLE_HEIGHT))
+        prof.draw_overlay(screen)
+        prof.mark("draw")
 
-        # Десен зид (како ѕид)
-        pygame.draw.rect(screen, (100, 100, 100), (WINDOW_WIDTH - 10, 0, 10, WINDOW_HEIGHT))
+        pygame.display.flip()
+        prof.mark("display")
 
-        # Топка
-        pygame.draw.rect(screen, BALL_COLOR, (int(state["ball_x"]), int(state["ball_y"]), BALL_SIZE, BALL_SIZE))
+    pygame.quit()
+    sys.exit()
 
-        # Информации: score, инструкции, pause/gameover
-        draw_text(screen, f"Поени: {state['score']}", 24, 10, 10, TEXT_COLOR)
-        draw_text(screen, "UP/DOWN: поместување на палката  |  P: пауза  |  R: рестарт  |  ESC: излез", 18, 10, WINDOW_HEIGHT - 30, STATUS_COLOR)
 
-        if paused:
-            draw_text(screen, "ПАУЗА — притисни P за продолжување", 32, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2, TEXT_COLOR, center=True)
+def bench(frames=20000):
+    # python pong.py --bench [N]: N кадри со бот, tracemalloc мери што останува и врвот по кадар
+    import os
+    import tracemalloc
 
-        if state["game_over"]:
-            draw_text(screen, "Играта заврши!", 48, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 40, TEXT_COLOR, center=True)
-            draw_text(screen, f"Краен резултат: {state['score']}", 32, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10, TEXT_COLOR, center=True)
-            draw_text(screen, "Притисни R за повторно да започнеш или ESC за излез", 20, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 60, STATUS_COLOR, center=True)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    sim = PongSim(1, seed=0)
+    view = PongView()
+
+    def step(i):
+        up, down = sim.track_ball()
+        sim.step(up[0], down[0])
+        if sim.game_over[0] or i % 600 == 0:
+            sim.reset()  # ботот не промашува, а vx расте 8% по удар
+
+    def draw(i):
+        view.draw(screen, sim, 0.5, False)
+
+    for i in range(1000):  # загревање: кешот на текст, поените до сега
+        step(i)
+        draw(i)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    worst = {step: 0, draw: 0}
+    for i in range(frames):
+        for phase in worst:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            phase(i)
+            worst[phase] = max(worst[phase], tracemalloc.get_traced_memory()[1] - before)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    pygame.quit()
 
-        pygame.display.flip()
+    print(f"{frames} кадри: {(current - baseline) / frames:.2f} B задржани по кадар")
+    print(f"  најмногу привремено во еден кадар: логика {worst[step]} B, цртање {worst[draw]} B")
 
-    pygame.quit()
-    sys.exit()
 
 if __name__ == "__main__":
-    main()
+    if "--bench" in sys.argv:
+        args = sys.argv[sys.argv.index("--bench") + 1:]
+        bench(int(args[0]) if args and args[0].isdigit() else 20000)
+    else:
+        main()
@@ -0,0 +1,341 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pong_sim import (
+    PongSim, WINDOW_WIDTH, WINDOW_HEIGHT, PADDLE_X, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, MAX_VY,
+)
+
+# ---------------------------
+# Векторизирана RL околина околу pong_sim (gym стил: reset / step)
+# ---------------------------
+# Правилата се истите од pong.py (PongSim): +8% на vx при удар, случаен
+# delta_vy во [-2, 2], vy ограничено на ±8, одбивање од десниот ѕид.
+#
+# Акции: 0 = стој, 1 = горе, 2 = долу (една по околина).
+# Награда: +1 за секој удар во палката, -1 кога топката ќе помине зад неа.
+# Околината што завршила (terminated / truncated) веднаш се ресетира во
+# истиот step(), а нејзините поени остануваат во final_score.
+#
+# Сите излезни низи (набљудувања, награди, terminated, truncated) се
+# претходно алоцирани и непрекинати (C-contiguous); step() ги презапишува
+# на место, па повикувачот треба да ги копира ако ги чува. Со workers > 0
+# околините се делат на процеси, а низите се во shared memory: главниот
+# процес ги пишува акциите, работниците ги пишуваат резултатите директно.
+
+NUM_ACTIONS = 3
+STATE_SIZE = 5  # paddle_y, ball_x, ball_y (нормирани на екранот), vx, vy (/ MAX_VY)
+PIXEL_SHAPE = (60, 80)  # 800x600 намалено 10 пати
+WALL_WIDTH = 10  # десниот ѕид како во pong.py
+ALIGN = 64
+
+
+def buffer_specs(num_envs, obs_mode, pixel_shape=PIXEL_SHAPE):
+    if obs_mode == "state":
+        obs = ((num_envs, STATE_SIZE), np.float32)
+    elif obs_mode == "pixels":
+        obs = ((num_envs,) + tuple(pixel_shape), np.uint8)
+    else:
+        raise ValueError(f"непознат obs_mode {obs_mode!r}, очекувано 'state' или 'pixels'")
+    return {
+        "obs": obs,
+        "actions": ((num_envs,), np.int8),
+        "reward": ((num_envs,), np.float32),
+        "terminated": ((num_envs,), bool),
+        "truncated": ((num_envs,), bool),
+        "final_score": ((num_envs,), np.int64),
+    }
+
+
+def _nbytes(shape, dtype):
+    # секоја низа почнува на граница од ALIGN бајти
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return -(-size // ALIGN) * ALIGN
+
+
+def buffer_size(specs):
+    return sum(_nbytes(shape, dtype) for shape, dtype in specs.values())
+
+
+def buffer_views(buf, specs):
+    views, offset = {}, 0
+    for name, (shape, dtype) in specs.items():
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += _nbytes(shape, dtype)
+    return views
+
+
+class PixelRenderer:
+    """
+    Го црта екранот на pong.py намален (сиви нијанси, 0 или 255) во дадена
+    uint8 низа (n, H, W). Намалениот пиксел е вклучен ако палката, топката
+    или ѕидот макар делумно го покриваат. Сите меѓурезултати се во однапред
+    алоцирани низи, па render() не алоцира нови NumPy низи.
+    """
+
+    def __init__(self, n, shape=PIXEL_SHAPE):
+        h, w = shape
+        row_lo = np.arange(h) * (WINDOW_HEIGHT / h)
+        col_lo = np.arange(w) * (WINDOW_WIDTH / w)
+        row_hi = row_lo + WINDOW_HEIGHT / h
+        col_hi = col_lo + WINDOW_WIDTH / w
+
+        # Објект [p, p + size) сече ќелија [lo, hi) ако lo - size < p < hi.
+        # Границите се проширени на (n, H) / (n, W): споредба со broadcast
+        # во NumPy алоцира внатрешен бафер при секој повик, а со полни низи не.
+        self.row_lo_paddle = np.tile(row_lo - PADDLE_HEIGHT, (n, 1))
+        self.row_lo_ball = np.tile(row_lo - BALL_SIZE, (n, 1))
+        self.row_hi = np.tile(row_hi, (n, 1))
+        self.col_lo_ball = np.tile(col_lo - BALL_SIZE, (n, 1))
+        self.col_hi = np.tile(col_hi, (n, 1))
+
+        self.background = np.zeros(shape, dtype=bool)
+        self.background[:, col_hi > WINDOW_WIDTH - WALL_WIDTH] = True
+        # Палката има фиксно x, па нејзините колони се исти за сите околини
+        self.paddle_cols = (col_lo - PADDLE_WIDTH < PADDLE_X) & (col_hi > PADDLE_X)
+
+        self.edge = np.empty(n, dtype=np.float64)
+        self.edge_rows = np.empty((n, h), dtype=np.float64)
+        self.edge_cols = np.empty((n, w), dtype=np.float64)
+        self.rows = np.empty((n, h), dtype=bool)
+        self.cols = np.empty((n, w), dtype=bool)
+        self.tmp_rows = np.empty((n, h), dtype=bool)
+        self.tmp_cols = np.empty((n, w), dtype=bool)
+        self.mask = np.empty((n, h, w), dtype=bool)
+        self.row_mask = np.empty((n, h, w), dtype=bool)
+        self.col_mask = np.empty((n, h, w), dtype=bool)
+
+    def span(self, pos, lo, hi, edges, out, tmp):
+        # out[i, j] = објектот на pos[i] (int координата, како pygame.Rect) ја сече ќелијата j
+        np.trunc(pos, out=self.edge)
+        np.copyto(edges, self.edge[:, None])
+        np.less(lo, edges, out=out)
+        np.greater(hi, edges, out=tmp)
+        out &= tmp
+
+    def fill(self, cols):
+        # mask |= rows x cols (надворешен производ по околина)
+        np.copyto(self.row_mask, self.rows[:, :, None])
+        np.copyto(self.col_mask, cols)
+        self.row_mask &= self.col_mask
+        self.mask |= self.row_mask
+
+    def render(self, sim, out):
+        np.copyto(self.mask, self.background)
+
+        self.span(sim.paddle_y, self.row_lo_paddle, self.row_hi, self.edge_rows, self.rows, self.tmp_rows)
+        self.fill(self.paddle_cols)
+
+        self.span(sim.ball_y, self.row_lo_ball, self.row_hi, self.edge_rows, self.rows, self.tmp_rows)
+        self.span(sim.ball_x, self.col_lo_ball, self.col_hi, self.edge_cols, self.cols, self.tmp_cols)
+        self.fill(self.cols[:, None, :])
+
+        # bool и uint8 се по еден бајт, па множењето оди без бафер за конверзија
+        np.multiply(self.mask.view(np.uint8), 255, out=out)
+
+
+class EnvShard:
+    """
+    Дел од околините (една PongSim) што пишува во дадените излезни низи.
+    Се користи директно (workers=0) или по еден во секој работен процес.
+    """
+
+    def __init__(self, views, seed, max_steps=None, pixel_shape=PIXEL_SHAPE):
+        self.views = views
+        n = len(views["actions"])
+        self.sim = PongSim(n, seed=seed)
+        self.max_steps = max_steps
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.pixels = views["obs"].ndim == 3
+        self.renderer = PixelRenderer(n, pixel_shape) if self.pixels else None
+        self.scale = np.array([1 / WINDOW_HEIGHT, 1 / WINDOW_WIDTH, 1 / WINDOW_HEIGHT, 1 / MAX_VY, 1 / MAX_VY])
+
+    def observe(self):
+        obs = self.views["obs"]
+        if self.pixels:
+            self.renderer.render(self.sim, obs)
+            return
+        sim = self.sim
+        for i, field in enumerate((sim.paddle_y, sim.ball_x, sim.ball_y, sim.vx, sim.vy)):
+            np.multiply(field, self.scale[i], out=obs[:, i], casting="same_kind")
+
+    def reset(self):
+        self.sim.reset()
+        self.steps[:] = 0
+        self.views["reward"][:] = 0
+        self.views["terminated"][:] = False
+        self.views["truncated"][:] = False
+        self.observe()
+
+    def step(self):
+        v = self.views
+        actions = v["actions"]
+        sim = self.sim
+
+        hit = sim.step(actions == 1, actions == 2)
+        self.steps += 1
+
+        np.copyto(v["terminated"], sim.game_over)
+        if self.max_steps is None:
+            v["truncated"][:] = False
+        else:
+            np.greater_equal(self.steps, self.max_steps, out=v["truncated"])
+            v["truncated"] &= ~sim.game_over
+        np.copyto(v["reward"], hit, casting="unsafe")
+        np.subtract(v["reward"], sim.game_over, out=v["reward"])
+
+        done = v["terminated"] | v["truncated"]
+        if done.any():
+            v["final_score"][done] = sim.score[done]
+            sim.reset(done)
+            self.steps[done] = 0
+        self.observe()
+
+
+def _worker(conn, shm_name, num_envs, obs_mode, pixel_shape, lo, hi, seed, max_steps):
+    # работен процес: чекори ги околините [lo, hi) директно во заедничката меморија
+    shm = shared_memory.SharedMemory(name=shm_name)
+    views = buffer_views(shm.buf, buffer_specs(num_envs, obs_mode, pixel_shape))
+    shard = EnvShard({name: a[lo:hi] for name, a in views.items()}, seed, max_steps, pixel_shape)
+    while True:
+        cmd = conn.recv()
+        if cmd == "step":
+            shard.step()
+        elif cmd == "reset":
+            shard.reset()
+        else:
+            break
+        conn.send(None)
+    del views, shard
+    shm.close()
+
+
+class PongVectorEnv:
+    """
+    num_envs независни pong околини со reset() / step(actions) како gym VectorEnv.
+
+    obs_mode="state" враќа float32 (num_envs, 5), а "pixels" uint8
+    (num_envs, H, W) намален екран (pixel_shape, стандардно 60x80).
+    max_steps ги прекинува (truncated) предолгите епизоди.
+    workers=0 ги врти околините во овој процес; со workers=k тие се делат
+    на k процеси што чекорат паралелно преку заедничка меморија.
+    """
+
+    def __init__(self, num_envs, obs_mode="state", pixel_shape=PIXEL_SHAPE, max_steps=None, workers=0, seed=None):
+        self.num_envs = num_envs
+        self.obs_mode = obs_mode
+        self.num_actions = NUM_ACTIONS
+        specs = buffer_specs(num_envs, obs_mode, pixel_shape)
+        self.workers = min(workers, num_envs)
+        seeds = np.random.SeedSequence(seed).spawn(max(self.workers, 1))
+
+        self.shm = None
+        self.procs = []
+        self.conns = []
+        if self.workers == 0:
+            self.buffers = buffer_views(bytearray(buffer_size(specs)), specs)
+            self.shard = EnvShard(self.buffers, seeds[0], max_steps, pixel_shape)
+        else:
+            self.shm = shared_memory.SharedMemory(create=True, size=buffer_size(specs))
+            self.buffers = buffer_views(self.shm.buf, specs)
+            bounds = np.linspace(0, num_envs, self.workers + 1).astype(int)
+            ctx = mp.get_context()
+            for k in range(self.workers):
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(
+                    target=_worker, daemon=True,
+                    args=(child, self.shm.name, num_envs, obs_mode, pixel_shape,
+                          bounds[k], bounds[k + 1], seeds[k], max_steps),
+                )
+                proc.start()
+                self.procs.append(proc)
+                self.conns.append(parent)
+
+        self.observations = self.buffers["obs"]
+        self.actions = self.buffers["actions"]
+        self.rewards = self.buffers["reward"]
+        self.terminated = self.buffers["terminated"]
+        self.truncated = self.buffers["truncated"]
+        self.final_score = self.buffers["final_score"]
+
+    def _run(self, cmd):
+        if self.workers == 0:
+            getattr(self.shard, cmd)()
+            return
+        for conn in self.conns:
+            conn.send(cmd)
+        for conn in self.conns:
+            conn.recv()
+
+    def reset(self):
+        self._run("reset")
+        return self.observations, {}
+
+    def step(self, actions=None):
+        # actions: низа со должина num_envs (0 / 1 / 2); без неа важи она што е веќе во self.actions
+        if actions is not None:
+            np.copyto(self.actions, actions, casting="unsafe")
+        self._run("step")
+        return self.observations, self.rewards, self.terminated, self.truncated, {"final_score": self.final_score}
+
+    def close(self):
+        for conn in self.conns:
+            conn.send("close")
+        for proc in self.procs:
+            proc.join()
+        self.procs, self.conns = [], []
+        if self.shm is not None:
+            self.observations = self.actions = self.rewards = None
+            self.terminated = self.truncated = self.final_score = self.buffers = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------
+# Benchmark: python pong_env.py [околини] [чекори] [процеси] [--pixels]
+# ---------------------------
+def benchmark(num_envs=4096, steps=500, workers=0, obs_mode="state"):
+    import time
+    import tracemalloc
+
+    with PongVectorEnv(num_envs, obs_mode, workers=workers, max_steps=5000, seed=0) as env:
+        obs, _ = env.reset()
+        rng = np.random.default_rng(0)
+        policy = rng.integers(0, NUM_ACTIONS, (steps, num_envs), dtype=np.int8)
+
+        episodes = 0
+        t0 = time.perf_counter()
+        for t in range(steps):
+            obs, reward, terminated, truncated, info = env.step(policy[t])
+            episodes += int(np.count_nonzero(terminated | truncated))
+        elapsed = time.perf_counter() - t0
+
+        print(f"{num_envs} околини x {steps} чекори, {workers} процеси, набљудувања {obs_mode} {obs.shape} {obs.dtype}")
+        print(f"  {num_envs * steps / elapsed:,.0f} чекори/s, {episodes} завршени епизоди")
+
+        if workers == 0 and obs_mode == "pixels":
+            shard = env.shard
+            shard.observe()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(100):
+                shard.observe()
+            after, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  цртање пиксели: {after - before} B задржани, врв {peak - before} B по 100 кадри")
+
+
+if __name__ == "__main__":
+    import sys
+
+    mode = "pixels" if "--pixels" in sys.argv else "state"
+    args = [int(a) for a in sys.argv[1:] if a.isdigit()]
+    benchmark(*args, obs_mode=mode)
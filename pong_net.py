@@ -0,0 +1,566 @@
+import asyncio
+import collections
+import multiprocessing as mp
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from pong_sim import PongSim, BALL_SIZE, PADDLE_HEIGHT, PADDLE_SPEED
+
+# ---------------------------
+# Pong со сервер: авторитативна симулација во посебен процес (asyncio)
+# ---------------------------
+# Серверот ги чекори сите мечеви одеднаш (една PongSim со ред по меч) на
+# фиксен тик и на секои SEND_EVERY тика им праќа на клиентите бинарни
+# (struct) делта снимки: само полињата што се смениле од претходната снимка
+# на мечот. Поврзувањето е преку TCP на loopback или Unix socket.
+#
+# Два играчи во меч играат наизменично (правилата се за една палка): кога
+# топката ќе помине зад палката, по RESTART_TICKS потегот го добива другиот
+# играч, а се памети најдобриот резултат на секој.
+#
+# Клиентот праќа по еден input (секвенца + копчиња) во секој тик и веднаш го
+# предвидува ефектот во локална PongSim. Кога ќе стигне снимка, ја зема
+# авторитативната состојба и одново ги применува inputs што серверот сè уште
+# не ги потврдил (reconciliation).
+#
+#   python pong_net.py server [адреса]
+#   python pong_net.py client [адреса]
+#   python pong_net.py loadtest [мечеви...] [--seconds S] [--address адреса]
+#
+# Адреса: unix:/патека или host:port (стандардно 127.0.0.1:7777).
+
+TICK_RATE = 60
+SEND_EVERY = 2        # снимка на секои 2 тика (30 Hz)
+RESTART_TICKS = 120   # пауза по крај на потегот
+MAX_QUEUED_INPUTS = 8  # постари inputs се фрлаат, па задоцнувањето останува ограничено
+DEFAULT_ADDRESS = "127.0.0.1:7777"
+
+# Пораки: еден бајт тип, па тело со фиксна големина (снимката ја одредува маската)
+MSG_HELLO, MSG_INPUT, MSG_STATS, MSG_WELCOME, MSG_SNAPSHOT, MSG_STATS_REPLY = range(1, 7)
+INPUT = struct.Struct("<IB")            # секвенца, копчиња (бит 0 горе, бит 1 долу)
+STATS = struct.Struct("<B")             # 1 = ресетирај ги статистиките по одговорот
+WELCOME = struct.Struct("<HBH")         # меч, место (0 / 1), тикови во секунда
+SNAPSHOT = struct.Struct("<IIH")        # тик, последен потврден input, маска на полиња
+SNAPSHOT_HEADER = struct.Struct("<BIIH")  # типот и SNAPSHOT во еден pack
+STATS_REPLY = struct.Struct("<IffffHH")  # тикови, доцнење p50/p99, работа p50/p99 (ms), мечеви, клиенти
+
+# Полиња во снимката, по редот на битовите во маската
+FLOAT_FIELDS = ("paddle_y", "ball_x", "ball_y", "vx", "vy")  # float32
+INT_FIELDS = ("score", "turn", "best0", "best1")              # uint16; turn = место на потег + 2 * game_over
+ALL_FIELDS = (1 << (len(FLOAT_FIELDS) + len(INT_FIELDS))) - 1
+
+UP, DOWN = 1, 2
+
+
+def parse_address(address):
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+SNAPSHOT_STRUCTS = {}  # маска -> struct за телото (маските се малку)
+
+
+def snapshot_struct(mask):
+    # struct за телото на снимка со дадена маска
+    s = SNAPSHOT_STRUCTS.get(mask)
+    if s is None:
+        floats = sum(1 for i in range(len(FLOAT_FIELDS)) if mask >> i & 1)
+        ints = sum(1 for i in range(len(INT_FIELDS)) if mask >> (len(FLOAT_FIELDS) + i) & 1)
+        s = SNAPSHOT_STRUCTS[mask] = struct.Struct("<" + "f" * floats + "H" * ints)
+    return s
+
+
+def encode_body(mask, floats, ints):
+    # floats / ints: вредностите на сите полиња; во пораката одат само оние од маската
+    values = [v for i, v in enumerate(floats) if mask >> i & 1]
+    values += [v for i, v in enumerate(ints) if mask >> (len(FLOAT_FIELDS) + i) & 1]
+    return snapshot_struct(mask).pack(*values)
+
+
+async def read_message(reader):
+    # (тип, распакувано тело) од серверот
+    kind = (await reader.readexactly(1))[0]
+    if kind == MSG_SNAPSHOT:
+        tick, ack, mask = SNAPSHOT.unpack(await reader.readexactly(SNAPSHOT.size))
+        body = snapshot_struct(mask)
+        return kind, (tick, ack, mask, body.unpack(await reader.readexactly(body.size)))
+    body = {MSG_WELCOME: WELCOME, MSG_STATS_REPLY: STATS_REPLY}[kind]
+    return kind, body.unpack(await reader.readexactly(body.size))
+
+
+# ---------------------------
+# Сервер
+# ---------------------------
+class Client:
+    """Еден поврзан клиент: неговите inputs во редица и последниот примен."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.match = None
+        self.seat = None
+        self.inputs = collections.deque(maxlen=MAX_QUEUED_INPUTS)  # постарите испаѓаат
+        self.ack = 0
+        self.full = True  # следната снимка мора да е цела (нов клиент или прескокната снимка)
+
+
+class Match:
+    def __init__(self, index):
+        self.index = index
+        self.seats = [None, None]
+
+
+class PongServer:
+    """
+    До capacity мечеви во една PongSim. tick() ги зема inputs, ги чекори сите
+    активни мечеви и праќа делта снимки; run() го врти tick() на фиксен
+    TICK_RATE и мери колку секој тик доцни и колку трае.
+    """
+
+    def __init__(self, capacity=1024, seed=None, send_every=SEND_EVERY):
+        self.capacity = capacity
+        self.send_every = send_every
+        self.sim = PongSim(capacity, seed=seed)
+        self.matches = [Match(i) for i in range(capacity)]
+        self.in_use = np.zeros(capacity, dtype=bool)
+        self.up = np.zeros(capacity, dtype=bool)
+        self.down = np.zeros(capacity, dtype=bool)
+        self.turn = np.zeros(capacity, dtype=np.int64)       # место на потег
+        self.best = np.zeros((capacity, 2), dtype=np.int64)  # најдобар резултат по место
+        self.over_ticks = np.zeros(capacity, dtype=np.int64)
+        self.clients = set()
+        self.ticks = 0
+
+        # последната пратена состојба по меч, за делтите
+        self.sent_floats = np.full((capacity, len(FLOAT_FIELDS)), np.nan, dtype=np.float32)
+        self.sent_ints = np.zeros((capacity, len(INT_FIELDS)), dtype=np.int64)
+        self.floats = np.empty_like(self.sent_floats)
+        self.ints = np.empty_like(self.sent_ints)
+        self.bits = 1 << np.arange(len(FLOAT_FIELDS) + len(INT_FIELDS))
+
+        self.lateness = collections.deque(maxlen=4096)
+        self.work = collections.deque(maxlen=4096)
+
+    # --- клиенти ---
+
+    def join(self, client):
+        # прво место што чека противник, па празен меч
+        free = [m for m in self.matches if self.in_use[m.index] and None in m.seats]
+        if not free:
+            free = [m for m in self.matches if not self.in_use[m.index]]
+            if not free:
+                return False
+            i = free[0].index
+            self.in_use[i] = True
+            self.sim.reset(np.arange(self.capacity) == i)
+            self.turn[i] = self.best[i] = self.over_ticks[i] = 0
+        match = free[0]
+        seat = match.seats.index(None)
+        match.seats[seat] = client
+        client.match, client.seat = match, seat
+        client.writer.write(bytes((MSG_WELCOME,)) + WELCOME.pack(match.index, seat, TICK_RATE))
+        return True
+
+    def leave(self, client):
+        self.clients.discard(client)
+        match = client.match
+        if match is None:
+            return
+        i = match.index
+        match.seats[client.seat] = None
+        if match.seats == [None, None]:
+            self.in_use[i] = False
+            self.up[i] = self.down[i] = False
+        elif self.turn[i] == client.seat:
+            self.turn[i] = 1 - client.seat  # потегот го зема играчот што остана
+
+    # --- тик ---
+
+    def tick(self):
+        self.ticks += 1
+
+        # Inputs: по еден од секој клиент (играчот на потег ја движи палката)
+        for client in self.clients:
+            match = client.match
+            if match is None or not client.inputs:
+                continue
+            client.ack, keys = client.inputs.popleft()
+            if client.seat == self.turn[match.index]:
+                self.up[match.index] = bool(keys & UP)
+                self.down[match.index] = bool(keys & DOWN)
+
+        self.sim.step(self.up, self.down, active=self.in_use)
+
+        # Крај на потегот: пауза, па потег на другиот играч (ако го има)
+        over = self.in_use & self.sim.game_over
+        self.over_ticks[over] += 1
+        restart = self.over_ticks >= RESTART_TICKS
+        if restart.any():
+            rows = np.flatnonzero(restart)
+            turn = self.turn[rows]
+            self.best[rows, turn] = np.maximum(self.best[rows, turn], self.sim.score[rows])
+            has_other = np.array([self.matches[i].seats[1 - t] is not None for i, t in zip(rows.tolist(), turn.tolist())])
+            self.turn[rows] = np.where(has_other, 1 - turn, turn)
+            self.over_ticks[rows] = 0
+            self.sim.reset(restart)
+            self.up[restart] = self.down[restart] = False
+
+        if self.ticks % self.send_every == 0:
+            self.broadcast()
+
+    def broadcast(self):
+        sim = self.sim
+        for j, field in enumerate(FLOAT_FIELDS):
+            self.floats[:, j] = getattr(sim, field)
+        self.ints[:, 0] = sim.score
+        self.ints[:, 1] = self.turn + 2 * sim.game_over
+        self.ints[:, 2:] = self.best
+
+        changed = np.concatenate([self.floats != self.sent_floats, self.ints != self.sent_ints], axis=1)
+        masks = changed @ self.bits
+        active = self.in_use.copy()
+        self.sent_floats[active] = self.floats[active]
+        self.sent_ints[active] = self.ints[active]
+
+        # Делтата е во однос на претходната снимка на мечот, не на потврденото кај секој клиент:
+        # врската е поток, па клиентот ги добива сите снимки по ред, а кој прескокнал добива цела.
+        # Телото на снимката се пакува еднаш по меч (и маска); заглавието со ack е по клиент
+        bodies = {}
+        floats_all, ints_all, masks_all = self.floats.tolist(), self.ints.tolist(), masks.tolist()
+        for client in self.clients:
+            match = client.match
+            if match is None:
+                continue
+            if client.writer.transport.get_write_buffer_size() > 64 * 1024:
+                client.full = True  # спор клиент: прескокни, а следниот пат прати цела снимка
+                continue
+            i = match.index
+            mask = ALL_FIELDS if client.full else masks_all[i]
+            client.full = False
+            body = bodies.get((i, mask))
+            if body is None:
+                body = bodies[i, mask] = encode_body(mask, floats_all[i], ints_all[i])
+            client.writer.write(SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, self.ticks, client.ack, mask) + body)
+
+    def stats(self):
+        late = np.array(self.lateness) * 1000 if self.lateness else np.zeros(1)
+        work = np.array(self.work) * 1000 if self.work else np.zeros(1)
+        lp, wp = np.percentile(late, (50, 99)), np.percentile(work, (50, 99))
+        return STATS_REPLY.pack(len(self.work), lp[0], lp[1], wp[0], wp[1],
+                                int(np.count_nonzero(self.in_use)), len(self.clients))
+
+    # --- мрежа ---
+
+    async def handle(self, reader, writer):
+        client = Client(writer)
+        self.clients.add(client)
+        try:
+            while True:
+                kind = (await reader.readexactly(1))[0]
+                if kind == MSG_INPUT:
+                    message = INPUT.unpack(await reader.readexactly(INPUT.size))
+                    if client.match is not None:  # пред HELLO нема палка што би ја движел
+                        client.inputs.append(message)
+                elif kind == MSG_HELLO:
+                    if client.match is None and not self.join(client):
+                        break  # серверот е полн
+                elif kind == MSG_STATS:
+                    (reset,) = STATS.unpack(await reader.readexactly(STATS.size))
+                    writer.write(bytes((MSG_STATS_REPLY,)) + self.stats())
+                    if reset:
+                        self.lateness.clear()
+                        self.work.clear()
+                else:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.leave(client)
+            writer.close()
+
+    async def run(self):
+        # фиксен тик: секој тик има закажано време; ако серверот заостане повеќе од 5 тика, тие се прескокнуваат
+        loop = asyncio.get_running_loop()
+        dt = 1.0 / TICK_RATE
+        next_tick = loop.time()
+        while True:
+            next_tick += dt
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            now = loop.time()
+            self.lateness.append(now - next_tick)
+            if now - next_tick > 5 * dt:
+                next_tick = now
+            t0 = time.perf_counter()
+            self.tick()
+            self.work.append(time.perf_counter() - t0)
+
+    async def serve(self, address, ready=None):
+        kind, where = parse_address(address)
+        if kind == "unix":
+            if os.path.exists(where):
+                os.remove(where)
+            server = await asyncio.start_unix_server(self.handle, where)
+        else:
+            server = await asyncio.start_server(self.handle, *where)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await self.run()
+
+
+def serve(address=DEFAULT_ADDRESS, capacity=1024, ready=None):
+    try:
+        asyncio.run(PongServer(capacity).serve(address, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+# ---------------------------
+# Клиент: предвидување и помирување со серверот
+# ---------------------------
+class PredictedMatch:
+    """
+    Локална копија од мечот (PongSim со еден ред). Своите inputs ги применува
+    веднаш; снимката од серверот ја презапишува состојбата, па inputs по
+    потврдениот (ack) повторно се применуваат врз неа.
+    """
+
+    def __init__(self):
+        self.sim = PongSim(1)
+        self.pending = collections.deque()  # (секвенца, копчиња) што серверот уште не ги применил
+        self.state = dict.fromkeys(FLOAT_FIELDS + INT_FIELDS, 0.0)
+        self.seat = 0
+        self.corrections = 0.0  # збир од грешките на предвидената палка (px), за статистика
+        self.snapshots = 0
+
+    @property
+    def my_turn(self):
+        return int(self.state["turn"]) % 2 == self.seat
+
+    def predict(self, seq, keys):
+        if self.my_turn and not self.sim.game_over[0]:
+            self.pending.append((seq, keys))
+            self.sim.step(bool(keys & UP), bool(keys & DOWN))
+
+    def apply(self, ack, mask, values):
+        names = [f for i, f in enumerate(FLOAT_FIELDS + INT_FIELDS) if mask >> i & 1]
+        self.state.update(zip(names, values))
+        while self.pending and self.pending[0][0] <= ack:
+            self.pending.popleft()
+
+        sim = self.sim
+        predicted = float(sim.paddle_y[0])
+        for field in FLOAT_FIELDS:
+            getattr(sim, field)[0] = self.state[field]
+        sim.score[0] = int(self.state["score"])
+        sim.game_over[0] = int(self.state["turn"]) >= 2
+        for _, keys in self.pending:
+            sim.step(bool(keys & UP), bool(keys & DOWN))
+        np.copyto(sim.prev_paddle_y, sim.paddle_y)
+        np.copyto(sim.prev_ball_x, sim.ball_x)
+        np.copyto(sim.prev_ball_y, sim.ball_y)
+        self.corrections += abs(float(sim.paddle_y[0]) - predicted)
+        self.snapshots += 1
+
+
+async def connect(address):
+    kind, where = parse_address(address)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(where)
+    return await asyncio.open_connection(*where)
+
+
+async def play(address):
+    # прозорец како pong.py; мрежата и цртањето одат во истиот asyncio циклус
+    import pygame
+    import text_cache
+    from pong import PongView, WINDOW_WIDTH, WINDOW_HEIGHT, STATUS_COLOR
+
+    reader, writer = await connect(address)
+    writer.write(bytes((MSG_HELLO,)))
+    kind, (match_id, seat, _) = await read_message(reader)
+    match = PredictedMatch()
+    match.seat = seat
+
+    async def receive():
+        while True:
+            kind, body = await read_message(reader)
+            if kind == MSG_SNAPSHOT:
+                _, ack, mask, values = body
+                match.apply(ack, mask, values)
+
+    receiver = asyncio.create_task(receive())
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption(f"Pong - меч {match_id}, играч {seat + 1}")
+    view = PongView()
+    seq = 0
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    try:
+        while not receiver.done():
+            if any(e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE)
+                   for e in pygame.event.get()):
+                break
+            keys = pygame.key.get_pressed()
+            seq += 1
+            bits = UP * keys[pygame.K_UP] | DOWN * keys[pygame.K_DOWN]
+            writer.write(bytes((MSG_INPUT,)) + INPUT.pack(seq, bits))
+            match.predict(seq, bits)
+
+            view.draw(screen, match.sim, 1.0, False)
+            turn = "твој потег" if match.my_turn else "потег на противникот"
+            best = f"Најдобро: {int(match.state['best0'])} / {int(match.state['best1'])}"
+            status = text_cache.render("Arial", 20, f"Играч {seat + 1}, {turn}   {best}", STATUS_COLOR)
+            screen.blit(status, (WINDOW_WIDTH - status.get_width() - 20, 12))
+            pygame.display.flip()
+
+            next_tick += 1.0 / TICK_RATE
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+    finally:
+        receiver.cancel()
+        writer.close()
+        pygame.quit()
+
+
+# ---------------------------
+# Load test: еден серверски процес, многу мечеви со ботови
+# ---------------------------
+class Bot:
+    """
+    Клиент без прозорец што ја следи топката од последната снимка. Со
+    predicted (PredictedMatch) ги предвидува и своите inputs, како play().
+    """
+
+    def __init__(self, reader, writer, seat, predicted=None):
+        self.reader = reader
+        self.writer = writer
+        self.state = dict.fromkeys(FLOAT_FIELDS + INT_FIELDS, 0.0) if predicted is None else predicted.state
+        self.predicted = predicted
+        if predicted is not None:
+            predicted.seat = seat
+        self.seq = 0
+        self.snapshots = 0
+        self.stats = None
+
+    async def receive(self):
+        try:
+            while True:
+                kind, body = await read_message(self.reader)
+                if kind == MSG_SNAPSHOT:
+                    _, ack, mask, values = body
+                    if self.predicted is not None:
+                        self.predicted.apply(ack, mask, values)
+                    else:
+                        names = [f for i, f in enumerate(FLOAT_FIELDS + INT_FIELDS) if mask >> i & 1]
+                        self.state.update(zip(names, values))
+                    self.snapshots += 1
+                elif kind == MSG_STATS_REPLY:
+                    self.stats.set_result(body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def send_input(self):
+        if self.predicted is not None:
+            sim = self.predicted.sim
+            ball_c, paddle_c = sim.ball_y[0] + BALL_SIZE / 2, sim.paddle_y[0] + PADDLE_HEIGHT / 2
+        else:
+            ball_c, paddle_c = self.state["ball_y"] + BALL_SIZE / 2, self.state["paddle_y"] + PADDLE_HEIGHT / 2
+        keys = UP if ball_c < paddle_c - PADDLE_SPEED else DOWN if ball_c > paddle_c + PADDLE_SPEED else 0
+        self.seq += 1
+        self.writer.write(bytes((MSG_INPUT,)) + INPUT.pack(self.seq, keys))
+        if self.predicted is not None:
+            self.predicted.predict(self.seq, keys)
+
+    async def request_stats(self, reset):
+        self.stats = asyncio.get_running_loop().create_future()
+        self.writer.write(bytes((MSG_STATS,)) + STATS.pack(reset))
+        return await self.stats
+
+
+async def swarm(address, matches, seconds, warmup=1.0):
+    # првиот бот предвидува како вистински клиент, за да се измери помирувањето
+    bots = []
+    for k in range(2 * matches):
+        reader, writer = await connect(address)
+        writer.write(bytes((MSG_HELLO,)))
+        _, (_, seat, _) = await read_message(reader)
+        bots.append(Bot(reader, writer, seat, PredictedMatch() if k == 0 else None))
+    tasks = [asyncio.create_task(bot.receive()) for bot in bots]
+
+    loop = asyncio.get_running_loop()
+    start = next_tick = loop.time()
+    reset = False
+    while loop.time() - start < warmup + seconds:
+        if not reset and loop.time() - start >= warmup:
+            await bots[0].request_stats(reset=1)  # мерењето почнува по загревањето
+            for bot in bots:
+                bot.snapshots = 0
+            bots[0].predicted.corrections = bots[0].predicted.snapshots = 0
+            reset = True
+        for bot in bots:
+            bot.send_input()
+        next_tick += 1.0 / TICK_RATE
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    stats = await bots[0].request_stats(reset=0)
+    snapshots = sum(bot.snapshots for bot in bots)
+    predicted = bots[0].predicted
+    correction = predicted.corrections / max(1, predicted.snapshots)
+    for bot in bots:
+        bot.writer.close()
+    for task in tasks:
+        task.cancel()
+    return stats, snapshots, correction
+
+
+def loadtest(match_counts=(100, 200, 400), seconds=5.0, address=None):
+    address = address or f"unix:/tmp/pong_net_{os.getpid()}.sock"
+    print(f"сервер на {address}, {TICK_RATE} тикови/s, снимка на секои {SEND_EVERY} тика, по 2 бота во меч")
+    print(f"{'мечеви':>7} {'клиенти':>8} {'тикови/s':>9} {'доцнење p50':>12} {'p99':>7} "
+          f"{'работа p50':>11} {'p99':>7} {'снимки/s':>9} {'корекција':>10}")
+    for matches in match_counts:
+        ready = mp.Event()
+        server = mp.Process(target=serve, args=(address, max(match_counts)), kwargs={"ready": ready}, daemon=True)
+        server.start()
+        ready.wait(10)
+        try:
+            stats, snapshots, correction = asyncio.run(swarm(address, matches, seconds))
+        finally:
+            server.terminate()
+            server.join()
+        ticks, late50, late99, work50, work99, active, clients = stats
+        print(f"{active:>7} {clients:>8} {ticks / seconds:9.1f} {late50:9.2f} ms {late99:4.1f} ms "
+              f"{work50:8.2f} ms {work99:4.1f} ms {snapshots / seconds:9.0f} {correction:7.2f} px")
+    if address.startswith("unix:") and os.path.exists(address[5:]):
+        os.remove(address[5:])
+
+
+def main(argv):
+    mode = argv[0] if argv else "server"
+    if mode == "loadtest":
+        seconds = float(argv[argv.index("--seconds") + 1]) if "--seconds" in argv else 5.0
+        address = argv[argv.index("--address") + 1] if "--address" in argv else None
+        counts = [int(a) for i, a in enumerate(argv[1:], 1) if a.isdigit() and argv[i - 1] != "--seconds"]
+        loadtest(counts or (100, 200, 400), seconds, address)
+        return
+    address = argv[1] if len(argv) > 1 else DEFAULT_ADDRESS
+    if mode == "server":
+        print(f"pong сервер на {address}")
+        serve(address)
+    elif mode == "client":
+        asyncio.run(play(address))
+    else:
+        print("usage: pong_net.py server [адреса] | client [адреса] | loadtest [мечеви...] [--seconds S]")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+import numpy as np
+
+# ---------------------------
+# Конфигурација (физика, без pygame)
+# ---------------------------
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+
+# Paddle (лeва палка)
+PADDLE_X = 20
+PADDLE_WIDTH = 20
+PADDLE_HEIGHT = 120
+PADDLE_SPEED = 6
+
+# Ball
+BALL_SIZE = 18
+BALL_INITIAL_SPEED_X = 4.0  # почетна хоризонтална брзина (апсолутна вредност)
+BALL_INITIAL_SPEED_Y = 2.0  # почетна вертикална компонента
+
+BALL_SPEEDUP = 1.08  # +8% на vx при секој удар во палката
+MAX_VY = 8.0
+
+
+# ---------------------------
+# Симулација на N независни мечеви
+# ---------------------------
+class PongSim:
+    """
+    Чиста (headless) симулација на pong физиката за n мечеви одеднаш.
+    Секое поле е NumPy низа со должина n, а step() ги поместува сите мечеви
+    со векторизирани проверки за ѕидови, палка и крај на играта. Судирот со
+    палката е континуиран (swept AABB), така што важи за која било брзина.
+    """
+
+    def __init__(self, n=1, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        self.paddle_x = PADDLE_X
+        self.paddle_y = np.zeros(n, dtype=np.float64)
+        self.ball_x = np.zeros(n, dtype=np.float64)
+        self.ball_y = np.zeros(n, dtype=np.float64)
+        self.vx = np.zeros(n, dtype=np.float64)
+        self.vy = np.zeros(n, dtype=np.float64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        # Позиции пред последниот чекор (за интерполација при цртање)
+        self.prev_paddle_y = np.zeros(n, dtype=np.float64)
+        self.prev_ball_x = np.zeros(n, dtype=np.float64)
+        self.prev_ball_y = np.zeros(n, dtype=np.float64)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Враќа почетни вредности за мечевите во mask (или за сите ако mask е None).
+        """
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        k = int(np.count_nonzero(mask))
+
+        self.paddle_y[mask] = (WINDOW_HEIGHT - PADDLE_HEIGHT) // 2
+        self.ball_x[mask] = WINDOW_WIDTH // 2
+        self.ball_y[mask] = WINDOW_HEIGHT // 2
+
+        # Насока: да дојде кон палката (од десно кон лево), па vx треба да биде негативно
+        self.vx[mask] = -BALL_INITIAL_SPEED_X
+        self.vy[mask] = self.rng.choice([-1.0, 1.0], size=k) * BALL_INITIAL_SPEED_Y
+
+        self.score[mask] = 0
+        self.game_over[mask] = False
+
+        self.prev_paddle_y[mask] = self.paddle_y[mask]
+        self.prev_ball_x[mask] = self.ball_x[mask]
+        self.prev_ball_y[mask] = self.ball_y[mask]
+
+    def step(self, up=False, down=False, active=None):
+        """
+        Еден логички чекор за сите мечеви.
+        up/down се bool (скалар или низа со должина n); active ги исклучува паузираните мечеви.
+        """
+        live = ~self.game_over
+        if active is not None:
+            live &= active
+
+        np.copyto(self.prev_paddle_y, self.paddle_y)
+        np.copyto(self.prev_ball_x, self.ball_x)
+        np.copyto(self.prev_ball_y, self.ball_y)
+
+        # Палка контрола (GORE / DOLU) + ограничување внатре во екран
+        move = (np.asarray(down, dtype=np.float64) - np.asarray(up, dtype=np.float64)) * PADDLE_SPEED
+        self.paddle_y += np.where(live, move, 0.0)
+        np.clip(self.paddle_y, 0, WINDOW_HEIGHT - PADDLE_HEIGHT, out=self.paddle_y)
+
+        # Поместување на топката: судирот со палката се бара по целата отсечка од
+        # чекорот (swept AABB), па и многу брза топка не може да „протуне“ низ неа
+        toi, hit = self.sweep_paddle(live)
+        t = np.where(live, toi, 0.0)
+        self.ball_x += self.vx * t
+        self.ball_y += self.vy * t
+
+        if hit.any():
+            k = int(np.count_nonzero(hit))
+            self.ball_x[hit] = self.paddle_x + PADDLE_WIDTH
+            self.vx[hit] = np.abs(self.vx[hit]) * BALL_SPEEDUP
+            # Мал случаен придонес во y-насока (од -2 до +2), ограничен на ±8
+            self.vy[hit] = np.clip(self.vy[hit] + self.rng.uniform(-2.0, 2.0, size=k), -MAX_VY, MAX_VY)
+            self.score[hit] += 1
+            # Остатокот од чекорот (1 - toi) топката го минува со новата брзина
+            rest = 1.0 - toi[hit]
+            self.ball_x[hit] += self.vx[hit] * rest
+            self.ball_y[hit] += self.vy[hit] * rest
+
+        # Судир со горен и долен предел - промени насока по y
+        top = live & (self.ball_y <= 0)
+        bottom = live & ~top & (self.ball_y + BALL_SIZE >= WINDOW_HEIGHT)
+        self.ball_y[top] = 0
+        self.ball_y[bottom] = WINDOW_HEIGHT - BALL_SIZE
+        flip = top | bottom
+        self.vy[flip] = -self.vy[flip]
+
+        # Судир со десниот зид - топката само се одбива
+        right = live & (self.ball_x + BALL_SIZE >= WINDOW_WIDTH)
+        self.ball_x[right] = WINDOW_WIDTH - BALL_SIZE
+        self.vx[right] = -self.vx[right]
+
+        # Game Over: топката поминала зад палката (на левата страна)
+        self.game_over |= live & (self.ball_x + BALL_SIZE < 0)
+
+        return hit
+
+    def sweep_paddle(self, live):
+        """
+        Swept AABB: палката се проширува за големината на топката, па топката
+        станува точка што се движи по отсечката (ball_x, ball_y) + t*(vx, vy), t во [0, 1].
+        Враќа (toi, hit): времето на првиот допир и кои мечеви удираат во палката.
+        Се брои само топка што оди кон палката (vx < 0); ако веќе се преклопува, toi е 0.
+        """
+        left = self.paddle_x - BALL_SIZE
+        right = self.paddle_x + PADDLE_WIDTH
+        toi = np.ones(self.n, dtype=np.float64)
+        hit = np.zeros(self.n, dtype=bool)
+
+        # Точниот тест треба само за топките што во овој чекор стигнуваат до палката по x
+        idx = np.flatnonzero(live & (self.vx < 0) & (self.ball_x + self.vx < right) & (self.ball_x > left))
+        if len(idx) == 0:
+            return toi, hit
+        x, y, vx, vy = self.ball_x[idx], self.ball_y[idx], self.vx[idx], self.vy[idx]
+        top = self.paddle_y[idx] - BALL_SIZE
+        bottom = self.paddle_y[idx] + PADDLE_HEIGHT
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Интервал во кој топката е меѓу левиот и десниот раб (отворен, како colliderect)
+            tx1 = (right - x) / vx
+            tx2 = (left - x) / vx
+            # Ако vy е 0, топката е или цело време или никогаш меѓу горниот и долниот раб
+            inside_y = (y > top) & (y < bottom)
+            ty1 = np.where(vy != 0, (top - y) / vy, np.where(inside_y, -np.inf, np.inf))
+            ty2 = np.where(vy != 0, (bottom - y) / vy, np.inf)
+
+        entry = np.maximum(np.minimum(tx1, tx2), np.minimum(ty1, ty2))
+        exit_ = np.minimum(np.maximum(tx1, tx2), np.maximum(ty1, ty2))
+        hit[idx] = (entry < exit_) & (entry <= 1.0) & (exit_ > 0.0)
+        toi[idx] = np.where(hit[idx], np.clip(entry, 0.0, 1.0), 1.0)
+        return toi, hit
+
+    def track_ball(self):
+        """
+        Едноставен бот за тестирање: палката го следи центарот на топката.
+        """
+        ball_c = self.ball_y + BALL_SIZE / 2
+        paddle_c = self.paddle_y + PADDLE_HEIGHT / 2
+        return ball_c < paddle_c - PADDLE_SPEED, ball_c > paddle_c + PADDLE_SPEED
+
+
+# ---------------------------
+# Benchmark: python pong_sim.py [мечеви] [чекори]
+# ---------------------------
+def benchmark(n=10000, steps=600, fps=60, seed=0):
+    import time
+
+    sim = PongSim(n, seed=seed)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        up, down = sim.track_ball()
+        sim.step(up, down)
+        sim.reset(sim.game_over)
+    elapsed = time.perf_counter() - t0
+
+    steps_per_sec = steps / elapsed
+    print(f"{n} мечеви x {steps} чекори: {elapsed:.3f}s")
+    print(f"  {steps_per_sec:.0f} чекори/s ({steps_per_sec / fps:.1f}x побрзо од реално време на {fps} FPS)")
+    print(f"  {n * steps_per_sec:,.0f} меч-чекори/s, просечни поени {sim.score.mean():.2f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = [int(a) for a in sys.argv[1:3]]
+    benchmark(*args)
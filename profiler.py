@@ -0,0 +1,154 @@
+import atexit
+import csv
+import json
+import os
+import time
+
+import numpy as np
+import pygame
+
+import text_cache
+
+# Frame-time instrumentation for the game loops.
+# Each loop calls begin_frame() when its work starts (after any clock.tick
+# wait) and mark(phase) when a phase ends; timings go into a fixed-size ring
+# buffer, so leaving it on costs a perf_counter() call and a store per phase.
+#
+#   F3  toggle the p50/p95/p99 overlay (plus cache stats, see add_stats)
+#   F4  dump the ring buffer to profile_<name>.csv
+#
+# GAME_PROFILE=0 disables recording, GAME_PROFILE_OVERLAY=1 starts with the
+# overlay on and GAME_PROFILE_DUMP=<path.csv|path.json> writes a trace at exit.
+
+PHASES = ("input", "update", "draw", "display")
+RING_SIZE = 1024
+OVERLAY_REFRESH = 30  # frames between overlay text updates
+
+PROFILERS = {}  # name -> FrameProfiler, for tools that read the timings of a running game
+
+
+def text_cache_stats():
+    s = text_cache.stats()
+    return f"{s['hit_rate']:6.1%} hit {s['surfaces']:>4} surf"
+
+
+class FrameProfiler:
+    def __init__(self, name="game", size=RING_SIZE, enabled=True, overlay=False):
+        self.name = name
+        self.enabled = enabled
+        self.overlay = overlay
+        self.columns = PHASES + ("frame",)
+        self.samples = np.zeros((size, len(self.columns)))
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self._phase_index = {phase: i for i, phase in enumerate(PHASES)}
+        self._row = np.zeros(len(self.columns))
+        self._frame_start = None
+        self._last = 0.0
+        self._overlay_lines = []
+        self._overlay_age = OVERLAY_REFRESH
+        self.stats_lines = {"text": text_cache_stats}  # label -> function() -> short overlay text
+
+    def begin_frame(self):
+        # closes the previous frame; "frame" is the full period between two calls, idle time included
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._row[-1] = now - self._frame_start
+            self.samples[self.index] = self._row
+            self.index = (self.index + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+            self._row[:] = 0
+        self._frame_start = self._last = now
+
+    def mark(self, phase):
+        # time since the previous mark (or begin_frame) is added to phase
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._row[self._phase_index[phase]] += now - self._last
+        self._last = now
+
+    def history(self):
+        # samples in chronological order, in seconds
+        if self.count < self.size:
+            return self.samples[:self.count]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def percentiles(self, qs=(50, 95, 99)):
+        # {column: {"p50": ms, ...}}
+        data = self.history() * 1000
+        result = {}
+        for i, column in enumerate(self.columns):
+            values = np.percentile(data[:, i], qs) if len(data) else np.zeros(len(qs))
+            result[column] = {f"p{q}": float(v) for q, v in zip(qs, values)}
+        return result
+
+    def add_stats(self, label, fn):
+        # one more overlay line under the timings, fn() read whenever the overlay refreshes
+        self.stats_lines[label] = fn
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                self.overlay = not self.overlay
+            elif event.key == pygame.K_F4:
+                self.dump(f"profile_{self.name}.csv")
+
+    def draw_overlay(self, surface):
+        # returns the rect it drew over (None when hidden)
+        if not self.overlay or not self.enabled:
+            return None
+        self._overlay_age += 1
+        if self._overlay_age >= OVERLAY_REFRESH:
+            self._overlay_age = 0
+            stats = self.percentiles()
+            self._overlay_lines = [
+                f"{column:>7} {s['p50']:6.2f} {s['p95']:6.2f} {s['p99']:6.2f}"
+                for column, s in stats.items()
+            ]
+            self._overlay_lines.insert(0, "ms        p50    p95    p99")
+            self._overlay_lines += [f"{label:>7} {fn()}" for label, fn in self.stats_lines.items()]
+        x = surface.get_width() - 240
+        y = surface.get_height() - 16 * len(self._overlay_lines) - 8
+        rect = pygame.draw.rect(surface, (0, 0, 0), (x - 6, y - 4, 240, 16 * len(self._overlay_lines) + 8))
+        for line in self._overlay_lines:
+            surface.blit(text_cache.render("freesansbold.ttf", 12, line, (0, 255, 0)), (x, y))
+            y += 16
+        return rect
+
+    def dump(self, path):
+        # CSV (one row per frame, ms) or JSON (rows + percentiles), picked by extension
+        data = self.history() * 1000
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({
+                    "name": self.name,
+                    "columns": list(self.columns),
+                    "frames": data.round(4).tolist(),
+                    "percentiles": self.percentiles(),
+                }, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(data.round(4).tolist())
+
+
+def create(name):
+    # profiler configured from the GAME_PROFILE* environment variables;
+    # a game that restarts its loop gets its existing profiler back
+    if name in PROFILERS:
+        return PROFILERS[name]
+    prof = FrameProfiler(
+        name,
+        enabled=os.environ.get("GAME_PROFILE", "1") != "0",
+        overlay=os.environ.get("GAME_PROFILE_OVERLAY") == "1",
+    )
+    dump_path = os.environ.get("GAME_PROFILE_DUMP")
+    if dump_path:
+        atexit.register(prof.dump, dump_path)
+    PROFILERS[name] = prof
+    return prof
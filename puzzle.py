@@ -1,15 +1,27 @@
 # Memory Puzzle - Upgraded Version
 # Includes: 10x10 board, new shape, new colors, hint highlight, streak scoring
 
-import random, pygame, sys
+import random, pygame, sys, time
 from pygame.locals import *
 
+import numpy as np
+
+import profiler
+import puzzle_engine
+import text_cache
+import tween
+from puzzle_engine import (
+    DONUT, SQUARE, DIAMOND, LINES, OVAL, BALL, TRIANGLE, BLUE, ALLCOLORS, ALLSHAPES,
+    getShapeAndColor, isMatch, findMatchingPair, hasWon, apply_score,
+)
+
 FPS = 30
 WINDOWWIDTH = 760
 WINDOWHEIGHT = 780
 REVEALSPEED = 8
 BOXSIZE = 50
 GAPSIZE = 15
+REVEALDURATION = 1000 * (BOXSIZE + REVEALSPEED) // (REVEALSPEED * FPS)  # ms, REVEALSPEED px per frame
 BOARDWIDTH = 10
 BOARDHEIGHT = 10
 assert (BOARDWIDTH * BOARDHEIGHT) % 2 == 0, "Board must have even number of boxes"
@@ -20,35 +32,16 @@ YMARGIN = int((WINDOWHEIGHT - (BOARDHEIGHT * (BOXSIZE + GAPSIZE))) / 2) + 60
 GRAY     = (100, 100, 100)
 NAVYBLUE = ( 60,  60, 100)
 WHITE    = (255, 255, 255)
-RED      = (255,   0,   0)
-GREEN    = (  0, 255,   0)
-BLUE     = (  0,   0, 255)
-YELLOW   = (255, 255,   0)
-ORANGE   = (255, 128,   0)
-PURPLE   = (255,   0, 255)
-CYAN     = (  0, 255, 255)
-PINK     = (114, 117, 166)
-LIME     = (177, 255, 94)
-TEAL     = (0, 200, 180)
-GOLD     = (230, 210, 40)
 
 BGCOLOR = NAVYBLUE
 LIGHTBGCOLOR = GRAY
 BOXCOLOR = WHITE
 HIGHLIGHTCOLOR = BLUE
+ATLASCOLORKEY = (1, 2, 3)   # transparent background of the icon atlas
 
-# Shapes
-DONUT = 'donut'
-SQUARE = 'square'
-DIAMOND = 'diamond'
-LINES = 'lines'
-OVAL = 'oval'
-BALL = 'ball'
-TRIANGLE = 'triangle'   # NEW SHAPE
-
-ALLCOLORS = (RED, GREEN, BLUE, YELLOW, ORANGE, PURPLE, CYAN, PINK, LIME, TEAL, GOLD)
-ALLSHAPES = (DONUT, SQUARE, DIAMOND, LINES, OVAL, BALL, TRIANGLE)
-assert len(ALLCOLORS) * len(ALLSHAPES) * 2 >= BOARDWIDTH * BOARDHEIGHT
+USEICONATLAS = True
+ICONATLAS = None
+ICONATLASKEY = None
 
 # ---------------- MAIN GAME ----------------
 
@@ -63,23 +56,43 @@ def main():
     mousex = 0
     mousey = 0
 
-    mainBoard = getRandomizedBoard()
+    mainBoard, iconIndex = getRandomizedBoard()
     revealedBoxes = generateRevealedBoxesData(False)
     firstSelection = None
 
     score = 0
     streak = 0
 
-    DISPLAYSURF.fill(BGCOLOR)
-    startGameAnimation(mainBoard)
+    # animations are ticked once per frame and never block the event loop
+    animations = tween.Scheduler(pygame.time.get_ticks)
+    renderer = BoardRenderer(DISPLAYSURF)
+    pygame.display.update(renderer.draw(mainBoard, revealedBoxes))
+    startGameAnimation(animations, renderer)
+    prof = profiler.create("puzzle")  # F3: frame-time overlay, F4: CSV dump
+    overlayShown = False
+
+    def startNewGame():
+        nonlocal mainBoard, iconIndex, revealedBoxes, streak
+        mainBoard, iconIndex = getRandomizedBoard()
+        revealedBoxes = generateRevealedBoxesData(False)
+        streak = 0
+        renderer.setBackground(BGCOLOR)
+        startGameAnimation(animations, renderer, delay=1200)
+
+    def hideBoxes(revealed, boxes):
+        for box in boxes:
+            revealed[box] = False
+            renderer.markBox(box[0], box[1])
 
     while True:
+        prof.begin_frame()
         mouseClicked = False
-
-        DISPLAYSURF.fill(BGCOLOR)
-        hintButton = drawBoard(mainBoard, revealedBoxes)
+        hintButton = renderer.hintButton
+        # the start and win sequences own the board; input is still read every frame
+        boardLocked = animations.busy("start") or animations.busy("won")
 
         for event in pygame.event.get():
+            prof.handle_event(event)
             if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
                 pygame.quit()
                 sys.exit()
@@ -91,113 +104,244 @@ def main():
 
                 # HINT CLICKED
                 if hintButton.collidepoint(mousex, mousey) and firstSelection:
-                    pair = findMatchingPair(mainBoard, firstSelection)
+                    pair = findMatchingPair(mainBoard, iconIndex, revealedBoxes, firstSelection)
                     if pair:
-                        # pass board and revealedBoxes into animation (DO NOT change revealedBoxes)
-                        hintHighlightAnimation(mainBoard, revealedBoxes, firstSelection, pair)
+                        # flashes the highlight only (DO NOT change revealedBoxes)
+                        hintHighlightAnimation(animations, renderer, firstSelection, pair)
                     continue
 
-        boxx, boxy = getBoxAtPixel(mousex, mousey)
+        prof.mark("input")
 
-        if boxx is not None and boxy is not None:
-            if not revealedBoxes[boxx][boxy]:
-                drawHighlightBox(boxx, boxy)
+        boxx, boxy = getBoxAtPixel(mousex, mousey)
 
-            if not revealedBoxes[boxx][boxy] and mouseClicked:
-                revealBoxesAnimation(mainBoard, [(boxx, boxy)])
-                revealedBoxes[boxx][boxy] = True
+        if boxx is not None and boxy is not None and not boardLocked:
+            if mouseClicked:
+                # the next click doesn't wait for a mismatched pair: it is covered right away
+                animations.cancel("mismatch", finish=True)
+            if not revealedBoxes[boxx, boxy] and mouseClicked:
+                revealBoxesAnimation(animations, renderer, [(boxx, boxy)])
+                revealedBoxes[boxx, boxy] = True
+                renderer.markBox(boxx, boxy)
 
                 if firstSelection is None:
                     firstSelection = (boxx, boxy)
 
                 else:
-                    icon1shape, icon1color = getShapeAndColor(mainBoard, firstSelection[0], firstSelection[1])
-                    icon2shape, icon2color = getShapeAndColor(mainBoard, boxx, boxy)
-
-                    if icon1shape != icon2shape or icon1color != icon2color:
-                        pygame.time.wait(1000)
-                        coverBoxesAnimation(mainBoard, [(firstSelection[0], firstSelection[1]), (boxx, boxy)])
-                        revealedBoxes[firstSelection[0]][firstSelection[1]] = False
-                        revealedBoxes[boxx][boxy] = False
+                    if not isMatch(mainBoard, firstSelection, (boxx, boxy)):
+                        # both stay up for a second, then cover, unless another box is clicked first
+                        boxes = [firstSelection, (boxx, boxy)]
+                        coverBoxesAnimation(animations, renderer, boxes, delay=REVEALDURATION + 1000,
+                                            done=lambda revealed=revealedBoxes, boxes=boxes: hideBoxes(revealed, boxes),
+                                            tag="mismatch")
                         streak = 0
                     else:
                         streak += 1
                         score, earned = apply_score(score, streak)
 
                         if hasWon(revealedBoxes):
-                            gameWonAnimation(mainBoard)
-                            pygame.time.wait(1500)
-                            mainBoard = getRandomizedBoard()
-                            revealedBoxes = generateRevealedBoxesData(False)
-                            streak = 0
-                            drawBoard(mainBoard, revealedBoxes)
-                            pygame.display.update()
-                            pygame.time.wait(1200)
-                            startGameAnimation(mainBoard)
+                            animations.cancel("hint", finish=True)
+                            gameWonAnimation(animations, renderer,
+                                             done=lambda: animations.add(1500, done=startNewGame, tag="won"))
 
                     firstSelection = None
 
-        drawScore(score)
-        pygame.display.update()
+        if boxx is not None and boxy is not None and not revealedBoxes[boxx, boxy] and not boardLocked:
+            renderer.setHover((boxx, boxy))
+        else:
+            renderer.setHover(None)
+        renderer.setScore(score)
+        animations.tick()
+        prof.mark("update")
+
+        if overlayShown and not prof.overlay:
+            renderer.invalidate()  # repaint what the overlay covered
+        rects = renderer.draw(mainBoard, revealedBoxes)
+        overlayRect = prof.draw_overlay(DISPLAYSURF)
+        overlayShown = overlayRect is not None
+        if overlayShown:
+            rects.append(overlayRect)
+        prof.mark("draw")
+
+        pygame.display.update(rects)
+        prof.mark("display")
         FPSCLOCK.tick(FPS)
 
 # ---------------- HINT LOGIC ----------------
 
-def findMatchingPair(board, firstSel):
-    shape, color = getShapeAndColor(board, firstSel[0], firstSel[1])
-    for x in range(BOARDWIDTH):
-        for y in range(BOARDHEIGHT):
-            if (x, y) != firstSel:
-                s, c = getShapeAndColor(board, x, y)
-                if s == shape and c == color:
-                    return (x, y)
-    return None
-
-def hintHighlightAnimation(board, revealed, box1, box2):
+def hintHighlightAnimation(animations, renderer, box1, box2):
     # Flash highlight, DO NOT reveal tiles and do NOT modify revealed.
-    # We redraw board each frame so we need to pass board and revealed.
-    for _ in range(4):
-        drawBoard(board, revealed)  # redraw background + tiles/buttons/title
-        drawHighlightBox(box1[0], box1[1])
-        drawHighlightBox(box2[0], box2[1])
-        pygame.display.update()
-        pygame.time.wait(150)
-
-        drawBoard(board, revealed)
-        pygame.display.update()
-        pygame.time.wait(100)
+    # Four flashes of 150 ms on / 100 ms off; a new hint restarts it.
+    animations.cancel("hint", finish=True)
 
-# ---------------- SCORING ----------------
+    def update(t):
+        on = t < 1.0 and (t * 1000) % 250 < 150
+        renderer.setFlash(box1, on)
+        renderer.setFlash(box2, on)
 
-def apply_score(score, streak):
-    base_points = 1
-    earned = base_points * (2 ** (streak - 1))
-    return score + earned, earned
+    animations.add(1000, update, tag="hint")
+
+# ---------------- SCORING ----------------
 
 def drawScore(score):
-    font = pygame.font.Font(None, 60)
-    scoreSurf = font.render(f"Score: {score}", True, WHITE)
-    DISPLAYSURF.blit(scoreSurf, (20, 10))
+    scoreSurf = text_cache.render(None, 60, f"Score: {score}", WHITE)
+    return DISPLAYSURF.blit(scoreSurf, (20, 10))
+
+def benchmarkScaling(sizes=(10, 20, 40, 80, 200), frames=20000):
+    # python puzzle.py --bench-scaling : board memory, generation time and per-click cost
+    # (hit test, match check, hint, win check) as the board grows
+    global BOARDWIDTH, BOARDHEIGHT, XMARGIN, YMARGIN
+    saved = (BOARDWIDTH, BOARDHEIGHT, XMARGIN, YMARGIN)
+
+    for size in sizes:
+        BOARDWIDTH = BOARDHEIGHT = size
+        XMARGIN = int((WINDOWWIDTH - (BOARDWIDTH * (BOXSIZE + GAPSIZE))) / 2)
+        YMARGIN = int((WINDOWHEIGHT - (BOARDHEIGHT * (BOXSIZE + GAPSIZE))) / 2) + 60
+        start = time.perf_counter()
+        board, iconIndex = getRandomizedBoard()
+        generated = time.perf_counter() - start
+        revealed = generateRevealedBoxesData(False)
+        memory = board.nbytes + revealed.nbytes + sum(a.nbytes for a in iconIndex)
+        span = size * (BOXSIZE + GAPSIZE)
+        points = [(XMARGIN + random.randrange(span), YMARGIN + random.randrange(span)) for _ in range(frames)]
+
+        start = time.perf_counter()
+        for x, y in points:
+            boxx, boxy = getBoxAtPixel(x, y)
+            if boxx is not None:
+                isMatch(board, (boxx, boxy), (0, 0))
+                findMatchingPair(board, iconIndex, revealed, (boxx, boxy))
+                hasWon(revealed)
+        elapsed = time.perf_counter() - start
+        print(f"{size}x{size}: {memory / 1024:.1f} KiB, generated in {generated * 1000:.2f} ms, "
+              f"{elapsed / frames * 1e6:.2f} us/click")
+
+    BOARDWIDTH, BOARDHEIGHT, XMARGIN, YMARGIN = saved
+
+# ---------------- DIRTY RECT RENDERER ----------------
+
+class BoardRenderer:
+    # Retained-mode board drawing: only boxes, the hover highlight and the
+    # header (title, score, hint button) that changed since the last frame
+    # are repainted, and draw() returns just those rects for display.update.
+    # Animations don't draw themselves: they set per-box cover widths,
+    # highlight flashes or the background color here and the boxes they touch
+    # are repainted on the next draw().
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.fullRedraw = True
+        self.dirtyBoxes = set()
+        self.hover = None
+        self.drawnHover = None
+        self.score = 0
+        self.drawnScore = None
+        self.scoreRect = None
+        self.hintButton = None
+        self.coverage = {}   # box -> width of the white cover drawn over its icon
+        self.flash = set()   # boxes with the hint highlight on
+        self.bgColor = BGCOLOR
+
+    def invalidate(self):
+        self.fullRedraw = True
+
+    def markBox(self, boxx, boxy):
+        self.dirtyBoxes.add((boxx, boxy))
+
+    def setHover(self, box):
+        self.hover = box
+
+    def setScore(self, score):
+        self.score = score
+
+    def setCoverage(self, box, coverage):
+        # None ends the override and the box is drawn from revealed again
+        if self.coverage.get(box) != coverage:
+            if coverage is None:
+                del self.coverage[box]
+            else:
+                self.coverage[box] = coverage
+            self.markBox(box[0], box[1])
+
+    def setFlash(self, box, on):
+        if on != (box in self.flash):
+            if on:
+                self.flash.add(box)
+            else:
+                self.flash.discard(box)
+            self.markBox(box[0], box[1])
+
+    def setBackground(self, color):
+        if color != self.bgColor:
+            self.bgColor = color
+            self.invalidate()
+
+    def draw(self, board, revealed):
+        rects = []
+        fullRedraw = self.fullRedraw
+
+        if fullRedraw:
+            self.surface.fill(self.bgColor)
+            self.hintButton = drawBoard(board, revealed)
+            self.scoreRect = drawScore(self.score)
+            self.drawnScore = self.score
+            self.fullRedraw = False
+            # drawBoard knows nothing of animations and highlights; repaint those boxes on top
+            self.dirtyBoxes.update(self.coverage, self.flash)
+            if self.hover is not None:
+                self.dirtyBoxes.add(self.hover)
+        elif self.hover != self.drawnHover:
+            if self.drawnHover is not None:
+                self.dirtyBoxes.add(self.drawnHover)
+            if self.hover is not None:
+                self.dirtyBoxes.add(self.hover)
+
+        for boxx, boxy in self.dirtyBoxes:
+            # clear the margin too: some icons draw one pixel past the box edge
+            boxRect = highlightRect(boxx, boxy)
+            pygame.draw.rect(self.surface, self.bgColor, boxRect)
+            coverage = self.coverage.get((boxx, boxy))
+            if coverage is None:
+                drawBox(board, revealed, boxx, boxy)
+            else:
+                drawBoxCover(board, boxx, boxy, coverage)
+            if (boxx, boxy) == self.hover or (boxx, boxy) in self.flash:
+                drawHighlightBox(boxx, boxy)
+            rects.append(boxRect)
+        self.dirtyBoxes.clear()
+        self.drawnHover = self.hover
+
+        if fullRedraw:
+            return [self.surface.get_rect()]
+
+        if self.score != self.drawnScore:
+            scoreSurf = text_cache.render(None, 60, f"Score: {self.score}", WHITE)
+            area = self.scoreRect.union(scoreSurf.get_rect(topleft=(20, 10)))
+            self.drawHeader(area)
+            rects.append(area)
+
+        return rects
+
+    def drawHeader(self, area):
+        # repaint the title, hint button and score clipped to area
+        self.surface.set_clip(area)
+        self.surface.fill(self.bgColor)
+        title = text_cache.render(None, 60, "Memory Game", WHITE)
+        self.surface.blit(title, (WINDOWWIDTH // 2 - title.get_width() // 2, 10))
+        drawHintButton()
+        self.scoreRect = drawScore(self.score)
+        self.drawnScore = self.score
+        self.surface.set_clip(None)
 
 # ---------------- BOARD FUNCTIONS ----------------
 
+# The rules live in puzzle_engine (no pygame); these bind them to the current board size.
+
 def generateRevealedBoxesData(val):
-    return [[val] * BOARDHEIGHT for _ in range(BOARDWIDTH)]
+    return puzzle_engine.generateRevealedBoxesData(BOARDWIDTH, BOARDHEIGHT, val)
 
 def getRandomizedBoard():
-    icons = [(shape, color) for color in ALLCOLORS for shape in ALLSHAPES]
-    random.shuffle(icons)
-    numIconsUsed = BOARDWIDTH * BOARDHEIGHT // 2
-    icons = (icons[:numIconsUsed] * 2)
-    random.shuffle(icons)
-
-    board = []
-    for x in range(BOARDWIDTH):
-        column = []
-        for y in range(BOARDHEIGHT):
-            column.append(icons.pop())
-        board.append(column)
-    return board
+    # returns (board, iconIndex): a uint16 array of icon IDs and the boxes holding each icon
+    return puzzle_engine.getRandomizedBoard(BOARDWIDTH, BOARDHEIGHT, np.random.default_rng(random.getrandbits(32)))
 
 def splitIntoGroupsOf(groupSize, theList):
     return [theList[i:i + groupSize] for i in range(0, len(theList), groupSize)]
@@ -208,122 +352,187 @@ def leftTopCoordsOfBox(boxx, boxy):
     return (left, top)
 
 def getBoxAtPixel(x, y):
-    for boxx in range(BOARDWIDTH):
-        for boxy in range(BOARDHEIGHT):
-            left, top = leftTopCoordsOfBox(boxx, boxy)
-            boxRect = pygame.Rect(left, top, BOXSIZE, BOXSIZE)
-            if boxRect.collidepoint(x, y):
-                return (boxx, boxy)
+    # inverse of leftTopCoordsOfBox; pixels in the gap between boxes hit nothing
+    boxx, offsetx = divmod(x - XMARGIN, BOXSIZE + GAPSIZE)
+    boxy, offsety = divmod(y - YMARGIN, BOXSIZE + GAPSIZE)
+    if 0 <= boxx < BOARDWIDTH and 0 <= boxy < BOARDHEIGHT and offsetx < BOXSIZE and offsety < BOXSIZE:
+        return (boxx, boxy)
     return (None, None)
 
 def drawIcon(shape, color, boxx, boxy):
+    left, top = leftTopCoordsOfBox(boxx, boxy)
+    if USEICONATLAS:
+        atlas, areas = getIconAtlas()
+        DISPLAYSURF.blit(atlas, (left, top), areas[(shape, color)])
+    else:
+        drawIconPrimitives(DISPLAYSURF, shape, color, left, top)
+
+def drawIconPrimitives(surface, shape, color, left, top):
     quarter = BOXSIZE // 4
     half = BOXSIZE // 2
-    left, top = leftTopCoordsOfBox(boxx, boxy)
 
     if shape == DONUT:
-        pygame.draw.circle(DISPLAYSURF, color, (left + half, top + half), half - 5)
-        pygame.draw.circle(DISPLAYSURF, BGCOLOR, (left + half, top + half), quarter - 5)
+        pygame.draw.circle(surface, color, (left + half, top + half), half - 5)
+        pygame.draw.circle(surface, BGCOLOR, (left + half, top + half), quarter - 5)
     elif shape == SQUARE:
-        pygame.draw.rect(DISPLAYSURF, color, (left + quarter, top + quarter, BOXSIZE - half, BOXSIZE - half))
+        pygame.draw.rect(surface, color, (left + quarter, top + quarter, BOXSIZE - half, BOXSIZE - half))
     elif shape == DIAMOND:
-        pygame.draw.polygon(DISPLAYSURF, color,
+        pygame.draw.polygon(surface, color,
                             [(left + half, top),
                              (left + BOXSIZE, top + half),
                              (left + half, top + BOXSIZE),
                              (left, top + half)])
     elif shape == LINES:
         for i in range(0, BOXSIZE, 4):
-            pygame.draw.line(DISPLAYSURF, color, (left, top + i), (left + i, top))
-            pygame.draw.line(DISPLAYSURF, color, (left + i, top + BOXSIZE - 1),
+            pygame.draw.line(surface, color, (left, top + i), (left + i, top))
+            pygame.draw.line(surface, color, (left + i, top + BOXSIZE - 1),
                                             (left + BOXSIZE - 1, top + i))
     elif shape == OVAL:
-        pygame.draw.ellipse(DISPLAYSURF, color, (left, top + quarter, BOXSIZE, half))
+        pygame.draw.ellipse(surface, color, (left, top + quarter, BOXSIZE, half))
     elif shape == BALL:
-        pygame.draw.circle(DISPLAYSURF, color, (left + half, top + half), half - 5)
+        pygame.draw.circle(surface, color, (left + half, top + half), half - 5)
     elif shape == TRIANGLE:
-        pygame.draw.polygon(DISPLAYSURF, color,
+        pygame.draw.polygon(surface, color,
                             [(left + half, top),
                              (left + BOXSIZE, top + BOXSIZE),
                              (left, top + BOXSIZE)])
 
-def getShapeAndColor(board, boxx, boxy):
-    # returns (shape, color)
-    return board[boxx][boxy]
-
-def drawBoxCovers(board, boxes, coverage):
-    for box in boxes:
-        left, top = leftTopCoordsOfBox(box[0], box[1])
-        pygame.draw.rect(DISPLAYSURF, BGCOLOR, (left, top, BOXSIZE, BOXSIZE))
-        shape, color = getShapeAndColor(board, box[0], box[1])
-        drawIcon(shape, color, box[0], box[1])
-        if coverage > 0:
-            pygame.draw.rect(DISPLAYSURF, BOXCOLOR, (left, top, coverage, BOXSIZE))
-    pygame.display.update()
-    FPSCLOCK.tick(FPS)
-
-def revealBoxesAnimation(board, boxesToReveal):
-    for coverage in range(BOXSIZE, -REVEALSPEED - 1, -REVEALSPEED):
-        drawBoxCovers(board, boxesToReveal, coverage)
-
-def coverBoxesAnimation(board, boxesToCover):
-    for coverage in range(0, BOXSIZE + REVEALSPEED, REVEALSPEED):
-        drawBoxCovers(board, boxesToCover, coverage)
+# ---------------- ICON ATLAS ----------------
+
+def getIconAtlas():
+    # Every (shape, color) icon pre-rendered once into a single colorkeyed
+    # surface; rebuilt whenever BOXSIZE, BGCOLOR or the shape/color sets change.
+    global ICONATLAS, ICONATLASKEY
+    key = (BOXSIZE, BGCOLOR, ALLSHAPES, ALLCOLORS)
+    if ICONATLAS is None or ICONATLASKEY != key:
+        ICONATLAS = buildIconAtlas()
+        ICONATLASKEY = key
+    return ICONATLAS
+
+def buildIconAtlas():
+    cell = BOXSIZE + 1  # polygons touch the pixel at BOXSIZE
+    atlas = pygame.Surface((cell * len(ALLSHAPES), cell * len(ALLCOLORS)))
+    atlas.fill(ATLASCOLORKEY)
+    areas = {}
+    for i, shape in enumerate(ALLSHAPES):
+        for j, color in enumerate(ALLCOLORS):
+            drawIconPrimitives(atlas, shape, color, i * cell, j * cell)
+            areas[(shape, color)] = pygame.Rect(i * cell, j * cell, cell, cell)
+    atlas.set_colorkey(ATLASCOLORKEY)
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert()
+    return atlas, areas
+
+def benchmarkIcons(frames=300):
+    # python puzzle.py --bench : frame time of a fully revealed board, atlas vs primitives
+    global FPSCLOCK, DISPLAYSURF, USEICONATLAS
+
+    pygame.init()
+    FPSCLOCK = pygame.time.Clock()
+    DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
+    board, iconIndex = getRandomizedBoard()
+    revealed = generateRevealedBoxesData(True)
+
+    results = {}
+    for useAtlas in (False, True):
+        USEICONATLAS = useAtlas
+        drawBoard(board, revealed)  # warm up (builds the atlas)
+        start = time.perf_counter()
+        for _ in range(frames):
+            DISPLAYSURF.fill(BGCOLOR)
+            drawBoard(board, revealed)
+        results[useAtlas] = (time.perf_counter() - start) / frames * 1000
+
+    print(f"primitives: {results[False]:.3f} ms/frame")
+    print(f"icon atlas: {results[True]:.3f} ms/frame ({results[False] / results[True]:.1f}x faster)")
+    pygame.quit()
+
+def drawBoxCover(board, boxx, boxy, coverage):
+    # the icon with its left `coverage` pixels hidden under the box (reveal/cover animations)
+    left, top = leftTopCoordsOfBox(boxx, boxy)
+    shape, color = getShapeAndColor(board, boxx, boxy)
+    drawIcon(shape, color, boxx, boxy)
+    if coverage > 0:
+        pygame.draw.rect(DISPLAYSURF, BOXCOLOR, (left, top, min(coverage, BOXSIZE), BOXSIZE))
+
+# ---------------- ANIMATIONS ----------------
+# Each one schedules tweens on the main loop's tween.Scheduler and returns at once.
+
+def boxCoverAnimation(animations, renderer, boxes, fromCoverage, toCoverage, delay=0, done=None, tag=None):
+    def update(t):
+        coverage = int(fromCoverage + (toCoverage - fromCoverage) * t)
+        for box in boxes:
+            renderer.setCoverage(box, coverage)
+
+    def finish():
+        for box in boxes:
+            renderer.setCoverage(box, None)
+        if done:
+            done()
+
+    return animations.add(REVEALDURATION, update, finish, delay, tag)
+
+def revealBoxesAnimation(animations, renderer, boxesToReveal, delay=0, done=None, tag=None):
+    return boxCoverAnimation(animations, renderer, boxesToReveal, BOXSIZE, 0, delay, done, tag)
+
+def coverBoxesAnimation(animations, renderer, boxesToCover, delay=0, done=None, tag=None):
+    return boxCoverAnimation(animations, renderer, boxesToCover, 0, BOXSIZE, delay, done, tag)
 
 def drawBoard(board, revealed):
-    font = pygame.font.Font(None, 60)
-    title = font.render("Memory Game", True, WHITE)
+    title = text_cache.render(None, 60, "Memory Game", WHITE)
     DISPLAYSURF.blit(title, (WINDOWWIDTH // 2 - title.get_width() // 2, 10))
 
     for boxx in range(BOARDWIDTH):
         for boxy in range(BOARDHEIGHT):
-            left, top = leftTopCoordsOfBox(boxx, boxy)
-            if not revealed[boxx][boxy]:
-                pygame.draw.rect(DISPLAYSURF, BOXCOLOR, (left, top, BOXSIZE, BOXSIZE))
-            else:
-                shape, color = getShapeAndColor(board, boxx, boxy)
-                drawIcon(shape, color, boxx, boxy)
+            drawBox(board, revealed, boxx, boxy)
 
     return drawHintButton()
 
+def drawBox(board, revealed, boxx, boxy):
+    if not revealed[boxx, boxy]:
+        left, top = leftTopCoordsOfBox(boxx, boxy)
+        pygame.draw.rect(DISPLAYSURF, BOXCOLOR, (left, top, BOXSIZE, BOXSIZE))
+    else:
+        shape, color = getShapeAndColor(board, boxx, boxy)
+        drawIcon(shape, color, boxx, boxy)
+
 def drawHintButton():
-    font = pygame.font.Font(None, 40)
-    text = font.render("HINT", True, WHITE)
+    text = text_cache.render(None, 40, "HINT", WHITE)
     button = pygame.Rect(WINDOWWIDTH - 160, 15, 120, 50)
     pygame.draw.rect(DISPLAYSURF, (200, 60, 60), button)
     DISPLAYSURF.blit(text, (button.x + 25, button.y + 10))
     return button
 
-def drawHighlightBox(boxx, boxy):
+def highlightRect(boxx, boxy):
     left, top = leftTopCoordsOfBox(boxx, boxy)
-    pygame.draw.rect(DISPLAYSURF, HIGHLIGHTCOLOR,
-                     (left - 5, top - 5, BOXSIZE + 10, BOXSIZE + 10), 4)
+    return pygame.Rect(left - 5, top - 5, BOXSIZE + 10, BOXSIZE + 10)
+
+def drawHighlightBox(boxx, boxy):
+    pygame.draw.rect(DISPLAYSURF, HIGHLIGHTCOLOR, highlightRect(boxx, boxy), 4)
 
-def startGameAnimation(board):
-    covered = generateRevealedBoxesData(False)
+def startGameAnimation(animations, renderer, delay=0):
+    # groups of 8 random boxes are peeked at one after another
     boxes = [(x, y) for x in range(BOARDWIDTH) for y in range(BOARDHEIGHT)]
     random.shuffle(boxes)
     groups = splitIntoGroupsOf(8, boxes)
 
-    drawBoard(board, covered)
-    for group in groups:
-        revealBoxesAnimation(board, group)
-        coverBoxesAnimation(board, group)
-
-def gameWonAnimation(board):
-    covered = generateRevealedBoxesData(True)
-    color1 = LIGHTBGCOLOR
-    color2 = BGCOLOR
+    for i, group in enumerate(groups):
+        start = delay + i * 2 * REVEALDURATION
+        revealBoxesAnimation(animations, renderer, group, delay=start, tag="start")
+        coverBoxesAnimation(animations, renderer, group, delay=start + REVEALDURATION, tag="start")
 
-    for _ in range(12):
-        color1, color2 = color2, color1
-        DISPLAYSURF.fill(color1)
-        drawBoard(board, covered)
-        pygame.display.update()
-        pygame.time.wait(200)
+def gameWonAnimation(animations, renderer, done=None):
+    # the background swaps between the two colors 12 times, 200 ms each
+    def update(t):
+        flips = min(11, int(t * 12))
+        renderer.setBackground(BGCOLOR if flips % 2 == 0 else LIGHTBGCOLOR)
 
-def hasWon(revealed):
-    return all(all(row) for row in revealed)
+    animations.add(2400, update, done, tag="won")
 
 if __name__ == "__main__":
-    main()
+    if "--bench" in sys.argv:
+        benchmarkIcons()
+    elif "--bench-scaling" in sys.argv:
+        benchmarkScaling()
+    else:
+        main()
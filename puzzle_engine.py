@@ -0,0 +1,79 @@
+# Memory Puzzle - game rules without pygame
+# Board generation, match checks, win check and streak scoring, shared by
+# puzzle.py and the headless simulator (puzzle_sim.py).
+
+import numpy as np
+
+# Shapes
+DONUT = 'donut'
+SQUARE = 'square'
+DIAMOND = 'diamond'
+LINES = 'lines'
+OVAL = 'oval'
+BALL = 'ball'
+TRIANGLE = 'triangle'
+
+# Colors
+RED      = (255,   0,   0)
+GREEN    = (  0, 255,   0)
+BLUE     = (  0,   0, 255)
+YELLOW   = (255, 255,   0)
+ORANGE   = (255, 128,   0)
+PURPLE   = (255,   0, 255)
+CYAN     = (  0, 255, 255)
+PINK     = (114, 117, 166)
+LIME     = (177, 255, 94)
+TEAL     = (0, 200, 180)
+GOLD     = (230, 210, 40)
+
+ALLCOLORS = (RED, GREEN, BLUE, YELLOW, ORANGE, PURPLE, CYAN, PINK, LIME, TEAL, GOLD)
+ALLSHAPES = (DONUT, SQUARE, DIAMOND, LINES, OVAL, BALL, TRIANGLE)
+# Boards larger than len(ALLCOLORS) * len(ALLSHAPES) * 2 boxes reuse icons for several pairs.
+
+def allIcons(shapes=ALLSHAPES, colors=ALLCOLORS):
+    return [(shape, color) for color in colors for shape in shapes]
+
+# Boards are NumPy arrays of icon IDs (indexes into ICONS); revealed is a bool array of the same shape.
+ICONS = tuple(allIcons())
+
+def generateRevealedBoxesData(width, height, val):
+    return np.full((width, height), val, dtype=bool)
+
+def getRandomizedBoard(width, height, rng=None):
+    # returns (board, iconIndex); iconIndex = (order, starts): the boxes holding icon i
+    # are order[starts[i]:starts[i + 1]], as flat indexes into board
+    assert (width * height) % 2 == 0, "Board must have even number of boxes"
+    rng = rng or np.random.default_rng()
+    numIconsUsed = width * height // 2
+    icons = rng.permutation(len(ICONS))[np.arange(numIconsUsed) % len(ICONS)]
+    board = rng.permutation(np.repeat(icons, 2)).astype(np.uint16).reshape(width, height)
+
+    order = np.argsort(board, axis=None, kind='stable').astype(np.int32)
+    starts = np.searchsorted(board.ravel()[order], np.arange(len(ICONS) + 1)).astype(np.int32)
+    return board, (order, starts)
+
+def getShapeAndColor(board, boxx, boxy):
+    # returns (shape, color)
+    return ICONS[board[boxx, boxy]]
+
+def isMatch(board, box1, box2):
+    return board[box1[0], box1[1]] == board[box2[0], box2[1]]
+
+def findMatchingPair(board, iconIndex, revealed, firstSel):
+    # only looks at the boxes holding the same icon (usually two)
+    order, starts = iconIndex
+    icon = board[firstSel[0], firstSel[1]]
+    height = board.shape[1]
+    for i in order[starts[icon]:starts[icon + 1]]:
+        x, y = divmod(int(i), height)
+        if (x, y) != firstSel and not revealed[x, y]:
+            return (x, y)
+    return None
+
+def hasWon(revealed):
+    return bool(revealed.all())
+
+def apply_score(score, streak):
+    base_points = 1
+    earned = base_points * (2 ** (streak - 1))
+    return score + earned, earned
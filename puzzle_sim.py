@@ -0,0 +1,234 @@
+# Memory Puzzle - headless Monte Carlo simulator
+# Plays many games at once with NumPy (one row per game) under a player
+# memory model, and reports score/turn distributions and throughput.
+#
+#   python puzzle_sim.py [games] [workers]
+#
+# Policies are memory sizes: a player remembers the last `memory` cards it
+# saw (0 = random clicking, None = perfect memory). Each turn it takes a pair
+# it remembers if it has one, otherwise flips an unseen card and, when the
+# match is remembered, flips it; otherwise it flips another unseen card.
+
+import random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import puzzle_engine
+from puzzle_engine import apply_score, hasWon, isMatch
+
+POLICIES = {"random": 0, "memory4": 4, "memory8": 8, "memory16": 16, "perfect": None}
+SIZES = ((4, 4), (6, 6), (10, 10))
+BATCH = 20000
+
+def numIcons(cells):
+    # the same icon count getRandomizedBoard uses: pairs reuse icons past this
+    return min(cells // 2, len(puzzle_engine.ICONS))
+
+def newBoards(rng, games, cells):
+    # icon id of every card, a random permutation per game (as getRandomizedBoard shuffles)
+    order = np.argsort(rng.random((games, cells)), axis=1)
+    return ((order // 2) % numIcons(cells)).astype(np.int32)
+
+def pick(keys, first, second):
+    # random column per row among `first`, falling back to `second` in rows where first is empty
+    return np.argmin(keys + np.float32(2) * ~first + np.float32(4) * ~second, axis=1)
+
+def randomBatch(rng, games, cells, maxTurns):
+    # memory 0 with one pair per icon: a turn matches with probability 1 / (cards left - 1),
+    # so the game is a chain on the number of pairs left and needs no board
+    pairs = np.full(games, cells // 2)
+    streak = np.zeros(games, dtype=np.int64)
+    score = np.zeros(games)
+    turns = np.zeros(games, dtype=np.int64)
+    misses = np.zeros(games, dtype=np.int64)
+    live = np.ones(games, dtype=bool)
+    while live.any():
+        match = live & (rng.random(games) * (2 * pairs - 1) < 1)
+        pairs -= match
+        streak = np.where(match, streak + 1, np.where(live, 0, streak))
+        score += np.where(match, np.exp2(streak - 1), 0.0)
+        misses += live & ~match
+        turns += live
+        live &= (pairs > 0) & (turns < maxTurns)
+    return score, turns, misses
+
+def simulateBatch(games, width, height, memory=None, seed=None, maxTurns=None):
+    """
+    Plays `games` independent games; returns (scores, turns, mismatches) arrays.
+    Scores are float64 because 2 ** (streak - 1) overflows int64 on big boards.
+    """
+    rng = np.random.default_rng(seed)
+    cells = width * height
+    icons = numIcons(cells)
+    maxTurns = maxTurns or 50 * cells * cells
+    perfect = memory is None or memory >= cells
+    if memory == 0 and icons == cells // 2:
+        return randomBatch(rng, games, cells, maxTurns)
+
+    icon = newBoards(rng, games, cells)
+    gone = np.zeros((games, cells), dtype=bool)
+    seen = np.full((games, cells), -1, dtype=np.int64)  # time each card was last seen
+    forgotten = np.zeros((games, cells), dtype=bool)     # pushed out of a bounded memory
+    streak = np.zeros(games, dtype=np.int64)
+    score = np.zeros(games)
+    turns = np.zeros(games, dtype=np.int64)
+    misses = np.zeros(games, dtype=np.int64)
+    live = np.arange(games)
+
+    results = (np.zeros(games), np.zeros(games, dtype=np.int64), np.zeros(games, dtype=np.int64))
+    rows = np.arange(games)
+    clock = 0
+
+    while len(live):
+        n = len(live)
+        r = rows[:n]
+
+        # what each player remembers: everything seen, or the `memory` most recent cards
+        recent = np.where(gone | forgotten, -1, seen)
+        if perfect:
+            known = recent >= 0
+        elif memory == 0:
+            known = np.zeros_like(gone)
+        else:
+            k = min(memory, cells)
+            kth = -np.partition(-recent, k - 1, axis=1)[:, k - 1:k]
+            known = (recent >= 0) & (recent >= kth)
+            forgotten |= (recent >= 0) & ~known
+
+        # remembered cards per icon
+        counts = np.bincount((r[:, None] * icons + icon).ravel(), known.ravel(), n * icons).reshape(n, icons)
+
+        # 1) a remembered pair: take it
+        pairIcon = counts.argmax(axis=1)
+        havePair = counts[r, pairIcon] >= 2
+        sameIcon = known & (icon == pairIcon[:, None])
+        keys = rng.random((n, cells), dtype=np.float32)
+        a = np.where(havePair, sameIcon.argmax(axis=1), pick(keys, ~known & ~gone, ~gone))
+        sameIcon[r, a] = False
+
+        # 2) otherwise flip an unseen card, then its remembered match or another unseen card
+        aIcon = icon[r, a]
+        matchKnown = ~havePair & (counts[r, aIcon] >= 1) & ~known[r, a]
+        partner = known & (icon == aIcon[:, None])
+        partner[r, a] = False
+        other = ~gone
+        other[r, a] = False
+        b = np.where(havePair, sameIcon.argmax(axis=1),
+                     np.where(matchKnown, partner.argmax(axis=1), pick(keys, other & ~known, other)))
+
+        match = icon[r, b] == aIcon
+        seen[r, a] = clock
+        seen[r, b] = clock + 1
+        forgotten[r, a] = forgotten[r, b] = False
+        clock += 2
+        gone[r, a] |= match
+        gone[r, b] |= match
+
+        streak = np.where(match, streak + 1, 0)
+        score += np.where(match, np.exp2(streak - 1), 0.0)
+        misses += ~match
+        turns += 1
+
+        done = gone.all(axis=1) | (turns >= maxTurns)
+        if done.any():
+            for out, column in zip(results, (score, turns, misses)):
+                out[live[done]] = column[done]
+            keep = ~done
+            live, icon, gone, seen, forgotten = live[keep], icon[keep], gone[keep], seen[keep], forgotten[keep]
+            streak, score, turns, misses = streak[keep], score[keep], turns[keep], misses[keep]
+
+    return results
+
+def playGame(width, height, memory=None, rng=random):
+    # the same player, one game at a time on puzzle_engine boards (reference for simulateBatch)
+    board, iconIndex = puzzle_engine.getRandomizedBoard(width, height, np.random.default_rng(rng.getrandbits(32)))
+    revealed = puzzle_engine.generateRevealedBoxesData(width, height, False)
+    boxes = [(x, y) for x in range(width) for y in range(height)]
+    memo = {}  # boxes seen and not matched yet, oldest first
+    score = streak = turns = misses = 0
+
+    def forget():
+        if memory is not None:
+            while len(memo) > memory:
+                del memo[next(iter(memo))]
+
+    def see(box):
+        memo.pop(box, None)
+        memo[box] = True
+        forget()
+
+    def knownMatch(box):
+        for other in memo:
+            if other != box and isMatch(board, box, other):
+                return other
+        return None
+
+    while not hasWon(revealed):
+        pair = next(((b1, b2) for b1 in memo for b2 in [knownMatch(b1)] if b2), None)
+        if pair:
+            first, second = pair
+        else:
+            hidden = [b for b in boxes if not revealed[b]]
+            unseen = [b for b in hidden if b not in memo] or hidden
+            first = rng.choice(unseen)
+            second = None if first in memo else knownMatch(first)
+            if second is None:
+                others = [b for b in hidden if b != first]
+                second = rng.choice([b for b in others if b not in memo] or others)
+        turns += 1
+        if isMatch(board, first, second):
+            streak += 1
+            score, earned = apply_score(score, streak)
+            for box in (first, second):
+                revealed[box] = True
+                memo.pop(box, None)
+        else:
+            see(first)
+            see(second)
+            streak = 0
+            misses += 1
+    return score, turns, misses
+
+def simulate(games, width, height, memory=None, workers=None, seed=0):
+    # simulateBatch in chunks of BATCH games, spread over a process pool
+    chunks = [(min(BATCH, games - first), width, height, memory, seed + first) for first in range(0, games, BATCH)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(simulateBatch, *zip(*chunks)))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+def histogram(values, bins=12, width=40):
+    # text histogram on log2 bins (scores grow exponentially with the streak)
+    logs = np.log2(np.maximum(values, 1))
+    counts, edges = np.histogram(logs, bins=bins)
+    lines = []
+    for count, lo, hi in zip(counts, edges, edges[1:]):
+        bar = "#" * int(round(width * count / counts.max()))
+        lines.append(f"  {2 ** lo:>12.0f} - {2 ** hi:<12.0f} {count:>9} {bar}")
+    return "\n".join(lines)
+
+def main(argv):
+    games = int(argv[0]) if argv else 100000
+    workers = int(argv[1]) if len(argv) > 1 else None
+
+    for width, height in SIZES:
+        for name, memory in POLICIES.items():
+            start = time.perf_counter()
+            score, turns, misses = simulate(games, width, height, memory, workers)
+            elapsed = time.perf_counter() - start
+            p50, p95, p99 = np.percentile(score, (50, 95, 99))
+            print(f"{width}x{height} {name}: {games / elapsed:,.0f} games/s, "
+                  f"turns {turns.mean():.1f}, misses {misses.mean():.1f}, "
+                  f"score mean {score.mean():.4g} p50 {p50:.4g} p95 {p95:.4g} p99 {p99:.4g}")
+            print(histogram(score))
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        # vectorized vs one-at-a-time engine games should give the same averages
+        for name, memory in POLICIES.items():
+            ref = np.array([playGame(6, 6, memory) for _ in range(2000)])
+            score, turns, misses = simulateBatch(20000, 6, 6, memory, seed=1)
+            print(f"{name}: turns {ref[:, 1].mean():.2f} vs {turns.mean():.2f}, "
+                  f"score {ref[:, 0].mean():.1f} vs {score.mean():.1f}")
+    else:
+        main([a for a in sys.argv[1:] if not a.startswith("--")])
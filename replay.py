@@ -0,0 +1,331 @@
+import hashlib
+import importlib
+import json
+import os
+import random
+import runpy
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import fixed_loop
+import profiler
+
+# Input record/replay harness for the four games.
+# While a game runs, pygame.event.get, pygame.key.get_pressed and the clock
+# are swapped for recording/replaying versions. Everything the game reads
+# (event batches, held keys, frame times) goes on one tape in call order,
+# next to the RNG seed. Game time is virtual: pygame.time.get_ticks is the
+# sum of the recorded frame times, so fixed-step logic, spawn timers and
+# animations replay exactly. A replay runs under the SDL dummy drivers with
+# no frame-rate cap, then reports frames/sec, per-phase timings from the
+# game's FrameProfiler and a hash of the last frame drawn. A hash that
+# differs from the one stored in the recording means the behavior changed.
+#
+#   python replay.py record <game> <tape.json> [--synth FRAMES]
+#   python replay.py replay <tape.json>... [--repeat N]
+#
+# --synth records FRAMES frames of seeded random input headlessly instead of
+# a live session. The profiler overlay is never drawn while recording or
+# replaying, because its numbers would change the frame hash.
+
+GAMES = {
+    # name -> (module, entry point); SpaceScavenger runs at import time
+    "pong": ("pong", "main"),
+    "maze": ("maze", "main"),
+    "puzzle": ("puzzle", "main"),
+    "space_scavenger": ("SpaceScavenger", None),
+}
+
+TAPE_VERSION = 1
+KEYS = sorted({value for name, value in vars(pygame).items() if name.startswith("K_")})
+SYNTH_KEYS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT) * 4 + (pygame.K_r, pygame.K_p)
+SYNTH_DT = 16  # ms per synthetic frame
+
+
+class ReplayDivergence(RuntimeError):
+    pass
+
+
+class Pressed:
+    # stands in for the pygame.key.get_pressed() result
+    def __init__(self, keys):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+def encode_event(event):
+    attrs = {}
+    for key, value in event.dict.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        if value is None or isinstance(value, (bool, int, float, str, list)):
+            attrs[key] = value
+    return [event.type, attrs]
+
+
+def decode_event(data):
+    event_type, attrs = data
+    return pygame.event.Event(event_type, {k: tuple(v) if isinstance(v, list) else v for k, v in attrs.items()})
+
+
+def screen_hash():
+    surface = pygame.display.get_surface()
+    if surface is None:
+        return None
+    return hashlib.sha1(pygame.image.tobytes(surface, "RGB")).hexdigest()[:16]
+
+
+class Session:
+    """
+    One run of a game. mode is "live" (record a real session), "synth"
+    (record seeded random input) or "replay" (play a tape back).
+    """
+
+    def __init__(self, mode, seed, tape=None, synth_frames=0):
+        self.mode = mode
+        self.seed = seed
+        self.tape = [] if tape is None else tape
+        self.pos = 0
+        self.now = 0
+        self.last_dt = 0
+        self.frames = 0
+        self.final_hash = None
+        self.synth_frames = synth_frames
+        self.synth_rng = random.Random(seed)
+        self.held = set()
+
+    # --- tape ---
+
+    def take(self, kind):
+        if self.pos >= len(self.tape):
+            return None
+        entry = self.tape[self.pos]
+        if entry[0] != kind:
+            raise ReplayDivergence(f"tape entry {self.pos}: game asked for {kind!r}, tape has {entry[0]!r}")
+        self.pos += 1
+        return entry[1]
+
+    # --- patched pygame functions ---
+
+    def get_events(self, *args, **kwargs):
+        if self.mode == "replay":
+            data = self.take("e")
+            events = [pygame.event.Event(pygame.QUIT)] if data is None else [decode_event(e) for e in data]
+        else:
+            if self.mode == "live":
+                events = self.real["event.get"](*args, **kwargs)
+            elif self.frames >= self.synth_frames:
+                events = [pygame.event.Event(pygame.QUIT)]
+            else:
+                events = self.synth_events()
+            self.tape.append(["e", [encode_event(e) for e in events]])
+        self.frames += 1
+        if any(e.type == pygame.QUIT for e in events):
+            self.final_hash = screen_hash()
+        return events
+
+    def get_pressed(self):
+        if self.mode == "replay":
+            return Pressed(self.take("k") or ())
+        if self.mode == "live":
+            real = self.real["key.get_pressed"]()
+            keys = [k for k in KEYS if real[k]]
+        else:
+            real = Pressed(self.held)
+            keys = sorted(self.held)
+        self.tape.append(["k", keys])
+        return real
+
+    def tick(self, clock, framerate=0):
+        if self.mode == "replay":
+            dt = self.take("t") or 0
+        else:
+            dt = clock.tick(framerate) if self.mode == "live" else SYNTH_DT
+            self.tape.append(["t", dt])
+        self.now += dt
+        self.last_dt = dt
+        return dt
+
+    def wait(self, ms):
+        if self.mode == "live":
+            self.real["time.wait"](ms)
+        self.now += ms
+        return ms
+
+    def synth_events(self):
+        rng = self.synth_rng
+        surface = pygame.display.get_surface()
+        width, height = surface.get_size() if surface else (800, 600)
+        events = []
+        if rng.random() < 0.15:
+            key = rng.choice(SYNTH_KEYS)
+            if key in self.held:
+                self.held.discard(key)
+                events.append(pygame.event.Event(pygame.KEYUP, key=key, mod=0, scancode=0, unicode=""))
+            else:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, scancode=0, unicode=""))
+                if key in (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT):
+                    self.held.add(key)
+        if rng.random() < 0.2:
+            pos = (rng.randrange(width), rng.randrange(height))
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+            if rng.random() < 0.5:
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+        return events
+
+    # --- running a game ---
+
+    def patch(self):
+        session = self
+
+        class Clock:
+            def __init__(self):
+                self.real = session.real["time.Clock"]()
+
+            def tick(self, framerate=0):
+                return session.tick(self.real, framerate)
+
+            def tick_busy_loop(self, framerate=0):
+                return session.tick(self.real, framerate)
+
+            def get_time(self):
+                return session.last_dt
+
+            def get_rawtime(self):
+                return session.last_dt
+
+            def get_fps(self):
+                return 1000.0 / session.last_dt if session.last_dt else 0.0
+
+        self.real = {
+            "event.get": pygame.event.get,
+            "key.get_pressed": pygame.key.get_pressed,
+            "time.Clock": pygame.time.Clock,
+            "time.get_ticks": pygame.time.get_ticks,
+            "time.wait": pygame.time.wait,
+            "time.delay": pygame.time.delay,
+            "time.set_timer": pygame.time.set_timer,
+            "draw_overlay": profiler.FrameProfiler.draw_overlay,
+        }
+        pygame.event.get = self.get_events
+        pygame.key.get_pressed = self.get_pressed
+        pygame.time.Clock = Clock
+        pygame.time.get_ticks = lambda: int(self.now)
+        pygame.time.wait = pygame.time.delay = self.wait
+        if self.mode != "live":
+            pygame.time.set_timer = lambda *args, **kwargs: None  # timer events come from the tape
+        profiler.FrameProfiler.draw_overlay = lambda prof, surface: None
+
+    def unpatch(self):
+        pygame.event.get = self.real["event.get"]
+        pygame.key.get_pressed = self.real["key.get_pressed"]
+        pygame.time.Clock = self.real["time.Clock"]
+        pygame.time.get_ticks = self.real["time.get_ticks"]
+        pygame.time.wait = self.real["time.wait"]
+        pygame.time.delay = self.real["time.delay"]
+        pygame.time.set_timer = self.real["time.set_timer"]
+        profiler.FrameProfiler.draw_overlay = self.real["draw_overlay"]
+
+    def run(self, game):
+        module, entry = GAMES[game]
+        os.environ["GAME_SEED"] = str(self.seed)
+        random.seed(self.seed)
+        np.random.seed(self.seed % 2 ** 32)
+        profiler.PROFILERS.clear()
+
+        self.patch()
+        start = time.perf_counter()
+        try:
+            if entry is None:
+                runpy.run_module(module, run_name="__main__")
+            else:
+                getattr(importlib.import_module(module), entry)()
+        except SystemExit:
+            pass
+        finally:
+            elapsed = time.perf_counter() - start
+            self.unpatch()
+
+        result = {"game": game, "frames": self.frames, "seconds": elapsed,
+                  "fps": self.frames / elapsed if elapsed else 0.0, "hash": self.final_hash}
+        prof = next(iter(profiler.PROFILERS.values()), None)
+        if prof is not None and prof.count:
+            means = prof.history().mean(axis=0) * 1000
+            result["phases_ms"] = {column: float(m) for column, m in zip(prof.columns, means)}
+        return result
+
+
+# ------------------------------------------------------
+# record / replay
+# ------------------------------------------------------
+
+def record(game, path, synth_frames=0):
+    if synth_frames:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    session = Session("synth" if synth_frames else "live", fixed_loop.resolve_seed(), synth_frames=synth_frames)
+    try:
+        result = session.run(game)
+    except FileNotFoundError as e:
+        print(f"{game}: nothing recorded ({e})")
+        return None
+    with open(path, "w") as f:
+        json.dump({"version": TAPE_VERSION, "game": game, "seed": session.seed,
+                   "frames": session.frames, "hash": session.final_hash, "tape": session.tape}, f)
+    print(f"{game}: {session.frames} frames -> {path} (hash {session.final_hash})")
+    return result
+
+
+def replay(path):
+    with open(path) as f:
+        recording = json.load(f)
+    if recording.get("version") != TAPE_VERSION:
+        raise ValueError(f"{path}: tape version {recording.get('version')}, expected {TAPE_VERSION}")
+    session = Session("replay", recording["seed"], recording["tape"])
+    try:
+        result = session.run(recording["game"])
+    except (ReplayDivergence, FileNotFoundError) as e:
+        # the game's call order changed, or an asset is missing (SpaceScavenger's are not checked in)
+        result = {"game": recording["game"], "error": str(e)}
+    result["recorded_hash"] = recording["hash"]
+    return result
+
+
+def main(argv):
+    if len(argv) >= 3 and argv[0] == "record":
+        frames = int(argv[argv.index("--synth") + 1]) if "--synth" in argv else 0
+        record(argv[1], argv[2], frames)
+        return
+    if len(argv) < 2 or argv[0] != "replay":
+        print("usage: replay.py record <game> <tape.json> [--synth FRAMES] | replay <tape.json>... [--repeat N]")
+        sys.exit(2)
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    repeat = int(argv[argv.index("--repeat") + 1]) if "--repeat" in argv else 1
+    paths = [a for a in argv[1:] if a.endswith(".json")]
+
+    failed = False
+    for path in paths:
+        for _ in range(repeat):
+            r = replay(path)
+            if "error" in r:
+                print(f"{r['game']:>16}  {path}: {r['error']}")
+                failed = True
+                continue
+            same = r["hash"] == r["recorded_hash"]
+            failed |= not same
+            phases = "  ".join(f"{k} {v:.3f}" for k, v in r.get("phases_ms", {}).items())
+            print(f"{r['game']:>16}  {r['frames']:6d} frames  {r['fps']:8.0f} fps  ms/frame: {phases}  "
+                  f"hash {r['hash']} {'ok' if same else 'DIFFERS from ' + str(r['recorded_hash'])}")
+    pygame.quit()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,348 @@
+import csv
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Headless SpaceScavenger simulation and difficulty sweep.
+# ScavengerSim plays many games at once with the rules of SpaceScavenger.py
+# (one row per game, asteroids and crystals in fixed-capacity slot arrays):
+# spawn timers counted in 60 Hz ticks, whole-pixel entity moves, Rect-rounded
+# player moves, speeds ramping every tick, game over on the first asteroid
+# hit. Hits are rect overlaps: the game also checks the sprites' pixel masks
+# for asteroids, which the sim has no images for, so it errs on the hard
+# side. Every difficulty constant is a per-row parameter, so one batch holds
+# many configurations; pilot() is a look-ahead dodging bot that also goes for
+# crystals. sweep() fans a parameter grid out over a process pool and writes
+# survival time and score percentiles per configuration to a CSV file.
+#
+#   python scavenger_sim.py [name=v1,v2,... ...] [--episodes N] [--seconds S]
+#                           [--workers K] [--out results.csv]
+
+# --- GAME CONSTANTS (SpaceScavenger.py) ---
+WIDTH, HEIGHT = 600, 800
+TICK_RATE = 60
+STEP_MS = 1000.0 / TICK_RATE
+PLAYER_SIZE = 80
+PLAYER_X = WIDTH // 2 - PLAYER_SIZE // 2  # spaceship rect centered at (WIDTH // 2, HEIGHT - 100)
+PLAYER_Y = HEIGHT - 100 - PLAYER_SIZE // 2
+CRYSTAL_SIZE = 60
+CRYSTAL_SPEED = 4
+SIZE_QUANTUM = 6  # SpriteCache(quantum=6)
+
+ASTEROID = 0
+CRYSTAL = 1
+
+# --- DIFFICULTY PARAMETERS (defaults are the game's hard-coded values) ---
+DEFAULTS = {
+    "asteroid_speed": 4.0,    # starting fall speed, px per tick
+    "asteroid_accel": 0.002,  # added to asteroid_speed every tick
+    "player_speed": 6.0,
+    "player_accel": 0.001,
+    "asteroid_ms": 1200,      # spawn timers
+    "crystal_ms": 2500,
+    "asteroid_min": 60,       # asteroid size range before quantizing
+    "asteroid_max": 120,
+}
+PARAMS = tuple(DEFAULTS)
+
+# --- PILOT ---
+LOOKAHEAD = 90  # ticks the bot looks ahead
+MARGIN = 6      # px kept free around the ship
+REACTION = 12   # ticks between the bot's decisions (200 ms, about a human's reaction time)
+MAX_SECONDS = 120  # default cap on one game's length
+
+
+def rect_round(v):
+    # pygame.Rect rounds float coordinates half away from zero
+    return np.copysign(np.floor(np.abs(v) + 0.5), v)
+
+
+def quantize(size):
+    return np.maximum(SIZE_QUANTUM, np.round(size / SIZE_QUANTUM) * SIZE_QUANTUM)
+
+
+def capacity(params):
+    # most entities of one game alive at once: fall time over spawn interval, for the slowest row
+    speed = rect_round(params["asteroid_speed"])
+    if np.any(speed < 1):
+        raise ValueError("asteroid_speed must be at least 0.5 px per tick")
+    asteroids = (HEIGHT + 2 * quantize(params["asteroid_max"])) / speed / (params["asteroid_ms"] / STEP_MS)
+    crystals = (HEIGHT + 2 * CRYSTAL_SIZE) / CRYSTAL_SPEED / (params["crystal_ms"] / STEP_MS)
+    return int(np.max(np.ceil(asteroids) + np.ceil(crystals))) + 2
+
+
+class ScavengerSim:
+    """
+    n independent SpaceScavenger games. params maps names from DEFAULTS to a
+    scalar or an array with one value per game; missing names use the default.
+    """
+
+    ROW_FIELDS = (
+        "asteroid_speed", "asteroid_accel", "player_speed", "player_accel", "asteroid_ms", "crystal_ms",
+        "asteroid_min", "asteroid_max", "asteroid_timer", "crystal_timer", "player_x", "ticks", "score",
+        "game_over", "ex", "ey", "size", "kind", "alive",
+    )
+
+    def __init__(self, params=None, n=None, seed=None):
+        params = {} if params is None else params
+        unknown = set(params) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown parameters: {sorted(unknown)}")
+        if n is None:
+            n = max([np.size(v) for v in params.values()] or [1])
+        p = {name: np.broadcast_to(np.asarray(params.get(name, DEFAULTS[name]), dtype=np.float64), n).copy()
+             for name in PARAMS}
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        for name in PARAMS:
+            setattr(self, name, p[name])
+        self.asteroid_min = self.asteroid_min.astype(np.int64)
+        self.asteroid_max = self.asteroid_max.astype(np.int64)
+        self.asteroid_timer = self.asteroid_ms.copy()
+        self.crystal_timer = self.crystal_ms.copy()
+
+        self.player_x = np.full(n, PLAYER_X, dtype=np.float64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        # entity slots, one row per game (entities are squares: asteroids and 60x60 crystals)
+        cap = capacity(p)
+        self.ex = np.zeros((n, cap))
+        self.ey = np.zeros((n, cap))
+        self.size = np.zeros((n, cap))
+        self.kind = np.zeros((n, cap), dtype=np.uint8)
+        self.alive = np.zeros((n, cap), dtype=bool)
+
+    def take(self, rows):
+        # keep only the games in rows (index or bool mask), e.g. to drop finished ones
+        for name in self.ROW_FIELDS:
+            setattr(self, name, getattr(self, name)[rows])
+        self.n = len(self.player_x)
+
+    def _spawn(self, rows, kind, size, center_x):
+        if np.any(self.alive[rows].all(axis=1)):
+            raise RuntimeError("entity slots full")  # capacity() is too small for these parameters
+        slot = np.argmax(~self.alive[rows], axis=1)
+        self.ex[rows, slot] = center_x - size // 2  # midtop=(center_x, -size)
+        self.ey[rows, slot] = -size
+        self.size[rows, slot] = size
+        self.kind[rows, slot] = kind
+        self.alive[rows, slot] = True
+
+    def _timer(self, timer, interval):
+        # FixedStepLoop.fired_timers for every game at once
+        timer -= STEP_MS
+        fired = timer <= 0
+        timer[fired] += interval[fired]
+        return np.flatnonzero(fired & ~self.game_over)
+
+    def step(self, left=False, right=False):
+        # one logic tick; left/right are the held arrow keys (scalar or one per game)
+        live = ~self.game_over
+
+        # Spawn timers
+        rows = self._timer(self.asteroid_timer, self.asteroid_ms)
+        if len(rows):
+            size = quantize(self.rng.integers(self.asteroid_min[rows], self.asteroid_max[rows] + 1))
+            self._spawn(rows, ASTEROID, size, self.rng.integers(50, WIDTH - 50 + 1, len(rows)))
+        rows = self._timer(self.crystal_timer, self.crystal_ms)
+        if len(rows):
+            self._spawn(rows, CRYSTAL, CRYSTAL_SIZE, self.rng.integers(40, WIDTH - 40 + 1, len(rows)))
+
+        # Player movement (left first, then right from the new position, like the game)
+        x = self.player_x
+        go = live & left & (x > 0)
+        x[go] = rect_round(x[go] - self.player_speed[go])
+        go = live & right & (x + PLAYER_SIZE < WIDTH)
+        x[go] = rect_round(x[go] + self.player_speed[go])
+
+        # Increasing difficulty
+        self.asteroid_speed += np.where(live, self.asteroid_accel, 0.0)
+        self.player_speed += np.where(live, self.player_accel, 0.0)
+
+        # Move (whole pixels, like EntityStore.move) and cull what fell off the bottom
+        vy = np.where(self.kind == ASTEROID, self.asteroid_speed[:, None], CRYSTAL_SPEED)
+        self.ey = np.where(live[:, None], rect_round(self.ey + vy), self.ey)
+        self.alive &= ~(self.ey > HEIGHT)
+
+        # Collide with player, collect crystals
+        touching = (
+            self.alive & live[:, None]
+            & (self.ex < x[:, None] + PLAYER_SIZE) & (self.ex + self.size > x[:, None])
+            & (self.ey < PLAYER_Y + PLAYER_SIZE) & (self.ey + self.size > PLAYER_Y)
+        )
+        asteroid = self.kind == ASTEROID
+        self.game_over |= (touching & asteroid).any(axis=1)
+        collected = touching & ~asteroid
+        self.score += collected.sum(axis=1)
+        self.alive &= ~collected
+        self.ticks += live
+
+    def pilot(self, lookahead=LOOKAHEAD, margin=MARGIN):
+        """
+        Bot keys (left, right) for every game. For holding left, nothing or
+        right it works out where the ship would be while each asteroid passes
+        through the ship's band (within lookahead ticks) and adds up the ones
+        it would touch, sooner ones weighing more; it picks the safest move
+        and breaks ties toward the lowest crystal still above the ship.
+        """
+        x = self.player_x[:, None, None]
+        speed = self.player_speed[:, None, None]
+        direction = np.array([-1.0, 0.0, 1.0])[None, :, None]
+
+        vy = rect_round(self.asteroid_speed)[:, None]
+        enter = np.maximum(0.0, (PLAYER_Y - self.ey - self.size) / vy)[:, None, :]  # ticks until it reaches the band
+        leave = ((PLAYER_Y + PLAYER_SIZE - self.ey) / vy)[:, None, :]
+        threat = (self.alive & (self.kind == ASTEROID))[:, None, :] & (enter < lookahead) & (leave > 0)
+
+        x_enter = np.clip(x + direction * speed * enter, 0, WIDTH - PLAYER_SIZE)
+        x_leave = np.clip(x + direction * speed * leave, 0, WIDTH - PLAYER_SIZE)
+        lo = np.minimum(x_enter, x_leave) - margin
+        hi = np.maximum(x_enter, x_leave) + PLAYER_SIZE + margin
+        ex = self.ex[:, None, :]
+        hits = threat & (ex < hi) & (ex + self.size[:, None, :] > lo)
+        danger = (hits * (lookahead - enter)).sum(axis=2)  # (n, 3)
+
+        crystals = self.alive & (self.kind == CRYSTAL) & (self.ey < PLAYER_Y + PLAYER_SIZE)
+        lowest = np.argmax(np.where(crystals, self.ey, -np.inf), axis=1)
+        goal = np.where(crystals.any(axis=1), self.ex[np.arange(self.n), lowest] + CRYSTAL_SIZE / 2, WIDTH / 2)
+        target = np.clip(self.player_x[:, None] + direction[0, :, 0] * self.player_speed[:, None], 0, WIDTH - PLAYER_SIZE)
+        distance = np.abs(target + PLAYER_SIZE / 2 - goal[:, None])
+
+        move = np.argmin(danger * WIDTH + distance, axis=1)
+        return move == 0, move == 2
+
+
+# ------------------------------------------------------
+# Sweep
+# ------------------------------------------------------
+
+def play(params, episodes=16, max_ticks=TICK_RATE * MAX_SECONDS, seed=0, reaction=REACTION):
+    """
+    episodes games per configuration (params: name -> array, one value per
+    configuration), flown by pilot() until game over or max_ticks. The pilot
+    decides every reaction ticks and holds its keys in between.
+    Returns survival seconds and scores, both shaped (configurations, episodes).
+    """
+    configs = max(np.size(v) for v in params.values())
+    rows = {name: np.repeat(np.broadcast_to(np.asarray(v, dtype=np.float64), configs), episodes)
+            for name, v in params.items()}
+    sim = ScavengerSim(rows, configs * episodes, seed=seed)
+    survival = np.zeros(sim.n, dtype=np.int64)
+    score = np.zeros(sim.n, dtype=np.int64)
+    index = np.arange(sim.n)
+
+    for t in range(max_ticks):
+        if t % reaction == 0:
+            keys = sim.pilot()
+        sim.step(*keys)
+        if t % TICK_RATE == 0 and sim.game_over.any():
+            # record finished games and drop them, so the batch shrinks as games end
+            done = sim.game_over
+            survival[index[done]] = sim.ticks[done]
+            score[index[done]] = sim.score[done]
+            index = index[~done]
+            keys = (keys[0][~done], keys[1][~done])
+            sim.take(~done)
+            if sim.n == 0:
+                break
+    survival[index] = sim.ticks
+    score[index] = sim.score
+    return survival.reshape(configs, episodes) / TICK_RATE, score.reshape(configs, episodes)
+
+
+def grid(spec):
+    # {"asteroid_ms": [800, 1200], ...} -> list of configurations (dicts), every combination
+    names = list(spec)
+    return [dict(zip(names, values)) for values in itertools.product(*(spec[n] for n in names))]
+
+
+def _play_chunk(configs, episodes, max_ticks, seed):
+    params = {name: [c[name] for c in configs] for name in configs[0]}
+    return play(params, episodes, max_ticks, seed)
+
+
+def summarize(configs, survival, score, max_ticks):
+    rows = []
+    for config, s, c in zip(configs, survival, score):
+        sp = np.percentile(s, (10, 50, 90))
+        cp = np.percentile(c, (10, 50, 90))
+        rows.append({
+            **{name: float(config.get(name, DEFAULTS[name])) for name in PARAMS},
+            "survival_mean": round(float(s.mean()), 2),
+            "survival_p10": round(float(sp[0]), 2),
+            "survival_p50": round(float(sp[1]), 2),
+            "survival_p90": round(float(sp[2]), 2),
+            "score_mean": round(float(c.mean()), 2),
+            "score_p10": float(cp[0]),
+            "score_p50": float(cp[1]),
+            "score_p90": float(cp[2]),
+            "capped": round(float(np.mean(s * TICK_RATE >= max_ticks)), 3),
+        })
+    return rows
+
+
+def sweep(configs, episodes=16, max_ticks=TICK_RATE * MAX_SECONDS, workers=None, chunk=128, seed=0):
+    # configurations are split in chunks over processes; each chunk is one vectorized batch
+    chunks = [configs[i:i + chunk] for i in range(0, len(configs), chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_play_chunk, c, episodes, max_ticks, seed + i) for i, c in enumerate(chunks)]
+        rows = []
+        for c, f in zip(chunks, futures):
+            survival, score = f.result()
+            rows += summarize(c, survival, score, max_ticks)
+    return rows
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+DEFAULT_GRID = {
+    "asteroid_accel": [0.001, 0.002, 0.003, 0.004],
+    "player_accel": [0.0005, 0.001, 0.002],
+    "asteroid_ms": [800, 1000, 1200, 1500, 2000],
+    "crystal_ms": [1500, 2500, 3500],
+    "asteroid_max": [90, 120, 150],
+}
+
+
+def main(argv):
+    def option(name, default, cast):
+        return cast(argv[argv.index(name) + 1]) if name in argv else default
+
+    episodes = option("--episodes", 16, int)
+    max_ticks = int(option("--seconds", MAX_SECONDS, float) * TICK_RATE)
+    workers = option("--workers", None, int)
+    out = option("--out", "scavenger_sweep.csv", str)
+    spec = {}
+    for arg in argv:
+        name, eq, values = arg.partition("=")
+        if eq:
+            spec[name] = [float(v) for v in values.split(",")]
+    configs = grid(spec or DEFAULT_GRID)
+
+    t0 = time.perf_counter()
+    rows = sweep(configs, episodes, max_ticks, workers)
+    elapsed = time.perf_counter() - t0
+    write_csv(out, rows)
+
+    print(f"{len(configs)} configurations x {episodes} episodes in {elapsed:.1f}s "
+          f"({len(configs) / elapsed * 60:,.0f} configurations/min) -> {out}")
+    print("hardest / easiest by median survival (s):")
+    ranked = sorted(rows, key=lambda r: r["survival_p50"])
+    for r in ranked if len(ranked) <= 6 else ranked[:3] + ranked[-3:]:
+        changed = ", ".join(f"{n}={r[n]:g}" for n in PARAMS if r[n] != DEFAULTS[n])
+        print(f"  {r['survival_p50']:7.1f}  score p50 {r['score_p50']:5.0f}  {changed or 'game defaults'}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
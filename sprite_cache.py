@@ -0,0 +1,68 @@
+import pygame
+
+# Holds images loaded once (by assets.AssetManager) and memoizes scaled
+# copies at quantized sizes, so spawning a sprite never allocates a surface
+# and the number of cached surfaces stays bounded. Collision masks are
+# memoized the same way, one per cached surface.
+
+
+class SpriteCache:
+    def __init__(self, quantum=6):
+        self.quantum = quantum
+        self.images = {}
+        self.scaled = {}
+        self.masks = {}  # surface -> pygame.mask.Mask
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, size):
+        q = self.quantum
+        return max(q, int(round(size / q)) * q)
+
+    def add(self, name, img):
+        # register a loaded, converted image (SpaceScavenger gets them from assets.AssetManager)
+        self.images[name] = img
+        return img
+
+    def get(self, name, w, h=None):
+        # scaled copy of a loaded image, snapped to the quantized size
+        w = self.quantize(w)
+        h = w if h is None else self.quantize(h)
+        key = (name, w, h)
+        img = self.scaled.get(key)
+        if img is not None:
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = pygame.transform.scale(self.images[name], (w, h))
+        self.scaled[key] = img
+        return img
+
+    def mask(self, img):
+        # pixel mask of a surface from this cache (opaque pixels set), built on first use
+        m = self.masks.get(img)
+        if m is None:
+            m = pygame.mask.from_surface(img)
+            self.masks[img] = m
+        return m
+
+    def prescale(self, name, min_size, max_size, masks=False):
+        # build every quantized square size up front so spawns only hit the dict
+        q = self.quantum
+        for size in range(self.quantize(min_size), self.quantize(max_size) + 1, q):
+            img = self.get(name, size, size)
+            if masks:
+                self.mask(img)
+
+    def stats(self):
+        surfaces = list(self.images.values()) + list(self.scaled.values())
+        total = self.hits + self.misses
+        return {
+            "images": len(self.images),
+            "scaled": len(self.scaled),
+            "masks": len(self.masks),
+            "bytes": sum(s.get_width() * s.get_height() * s.get_bytesize() for s in surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
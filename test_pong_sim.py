@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from pong_sim import PongSim, WINDOW_WIDTH, WINDOW_HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, MAX_VY
+
+# Својства на swept AABB судирот при екстремни брзини: случајни состојби со
+# топка десно од палката и |vx| до 5000 px по чекор (палката е широка 20 px).
+
+MAX_SPEED = 5000
+N = 50000
+
+
+def random_states(n, seed, vy=None):
+    rng = np.random.default_rng(seed)
+    sim = PongSim(n, seed=seed)
+    face = sim.paddle_x + PADDLE_WIDTH
+    sim.paddle_y[:] = rng.uniform(0, WINDOW_HEIGHT - PADDLE_HEIGHT, n)
+    sim.ball_x[:] = rng.uniform(face, WINDOW_WIDTH - BALL_SIZE, n)
+    sim.ball_y[:] = rng.uniform(0, WINDOW_HEIGHT - BALL_SIZE, n)
+    sim.vx[:] = -np.exp(rng.uniform(0, np.log(MAX_SPEED), n))
+    sim.vy[:] = rng.uniform(-MAX_VY, MAX_VY, n) if vy is None else vy
+    return sim
+
+
+def crossings(sim):
+    # каде отсечката на движење го сече десниот раб на палката (независно од sweep_paddle)
+    face = sim.paddle_x + PADDLE_WIDTH
+    t_face = (face - sim.ball_x) / sim.vx
+    y_face = sim.ball_y + sim.vy * t_face
+    crosses = (t_face <= 1.0) & (y_face > sim.paddle_y - BALL_SIZE) & (y_face < sim.paddle_y + PADDLE_HEIGHT)
+    return crosses, t_face
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_tunnelling_at_extreme_speed(seed):
+    sim = random_states(N, seed)
+    crosses, _ = crossings(sim)
+    hit = sim.step()
+    assert np.count_nonzero(crosses & ~hit) == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ball_leaves_the_paddle_moving_right(seed):
+    sim = random_states(N, seed)
+    hit = sim.step()
+    assert hit.any()
+    # при огромна брзина остатокот од чекорот може да ја однесе до десниот зид и назад
+    at_right = sim.ball_x == WINDOW_WIDTH - BALL_SIZE
+    assert np.all(sim.ball_x[hit] >= sim.paddle_x + PADDLE_WIDTH)
+    assert np.all((sim.vx[hit] > 0) | at_right[hit])
+
+
+def test_time_of_impact_is_the_face_crossing():
+    # без vy топката го допира десниот раб точно кога отсечката го сече
+    sim = random_states(N, 7, vy=0.0)
+    sim.ball_y[:] = sim.paddle_y + np.random.default_rng(7).uniform(-BALL_SIZE + 1, PADDLE_HEIGHT - 1, N)
+    crosses, t_face = crossings(sim)
+    toi, hit = sim.sweep_paddle(np.ones(N, dtype=bool))
+    assert np.array_equal(hit, crosses)
+    np.testing.assert_allclose(toi[hit], t_face[hit], rtol=0, atol=1e-9)
+
+
+def test_ball_passing_above_or_below_is_not_a_hit():
+    sim = random_states(N, 8, vy=0.0)
+    above = np.random.default_rng(8).random(N) < 0.5
+    sim.ball_y[:] = np.where(above, sim.paddle_y - BALL_SIZE - 1, sim.paddle_y + PADDLE_HEIGHT + 1)
+    sim.ball_y[:] = np.clip(sim.ball_y, 0, WINDOW_HEIGHT - BALL_SIZE)
+    miss = (sim.ball_y + BALL_SIZE <= sim.paddle_y) | (sim.ball_y >= sim.paddle_y + PADDLE_HEIGHT)
+    hit = sim.step()
+    assert not np.any(hit & miss)
+
+
+def test_catches_hits_the_discrete_test_misses():
+    # стариот тест гледа само каде топката е на крајот од чекорот; при овие брзини промашува повеќето
+    sim = random_states(N, 9)
+    crosses, _ = crossings(sim)
+    end_x = np.trunc(sim.ball_x + sim.vx)
+    discrete = crosses & (end_x < sim.paddle_x + PADDLE_WIDTH) & (end_x + BALL_SIZE > sim.paddle_x)
+    hit = sim.step()
+    assert np.count_nonzero(discrete) < np.count_nonzero(crosses) // 2
+    assert np.array_equal(hit & crosses, crosses)
@@ -0,0 +1,88 @@
+from tween import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def run(scheduler, clock, until, step=10):
+    for clock.now in range(clock.now, until, step):
+        scheduler.tick()
+
+
+def test_overlapping_tweens_and_chained_timer():
+    # two overlapping tweens, and a delayed timer added from the second one's done()
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    seen = {"a": [], "b": [], "c": []}
+    scheduler.add(100, seen["a"].append, tag="a")
+    scheduler.add(40, seen["b"].append, delay=30, tag="b",
+                  done=lambda: scheduler.add(0, done=lambda: seen["c"].append(clock.now), delay=50))
+
+    run(scheduler, clock, 200)
+
+    assert seen["a"] == [i / 10 for i in range(11)]
+    assert seen["b"] == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert seen["c"] == [120]
+    assert not scheduler.busy()
+
+
+def test_busy_by_tag():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    scheduler.add(50, tag="reveal")
+    scheduler.add(10, delay=100, tag="hint")
+
+    assert scheduler.busy("reveal") and scheduler.busy("hint")
+    run(scheduler, clock, 60)
+    assert not scheduler.busy("reveal") and scheduler.busy("hint")
+    run(scheduler, clock, 120)
+    assert not scheduler.busy()
+
+
+def test_cancel_drops_or_finishes():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    dropped, finished, done = [], [], []
+    scheduler.add(100, dropped.append, done=lambda: done.append("dropped"), tag="drop")
+    scheduler.add(100, finished.append, done=lambda: done.append("finished"), tag="finish")
+    run(scheduler, clock, 30)
+
+    scheduler.cancel("drop")
+    scheduler.cancel("finish", finish=True)
+
+    assert dropped == [0.0, 0.1, 0.2]
+    assert finished == [0.0, 0.1, 0.2, 1.0]
+    assert done == ["finished"]
+    assert not scheduler.busy()
+
+
+def test_tween_added_during_tick_starts_next_tick():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    seen = []
+    scheduler.add(0, done=lambda: scheduler.add(20, seen.append))
+
+    scheduler.tick()
+    assert seen == []
+    run(scheduler, clock, 40)
+    assert seen == [0.0, 0.5, 1.0]
+
+
+def test_many_concurrent_tweens_never_block():
+    # every tick returns immediately and advances all running tweens together
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    progress = [[] for _ in range(100)]
+    for i, seen in enumerate(progress):
+        scheduler.add(100, seen.append, delay=i)
+
+    run(scheduler, clock, 300, step=1)
+
+    assert all(seen[0] == 0.0 and seen[-1] == 1.0 for seen in progress)
+    assert all(len(seen) == 101 for seen in progress)
+    assert not scheduler.busy()
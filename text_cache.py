@@ -0,0 +1,85 @@
+import os
+from collections import OrderedDict
+
+import pygame
+
+# Shared text rendering cache for all four games.
+# Fonts are built once per (font, size) and rendered labels are kept in an LRU
+# keyed by (font, size, text, color, antialias), so unchanged strings are not
+# re-rasterized every frame.
+
+MAX_SURFACES = 256
+
+
+class TextCache:
+    def __init__(self, max_surfaces=MAX_SURFACES):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, font, size):
+        # font is None (pygame default), a font file ("freesansbold.ttf") or a system font name ("Arial")
+        key = (font, size)
+        f = self.fonts.get(key)
+        if f is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            if font is None or os.path.splitext(font)[1]:
+                f = pygame.font.Font(font, size)
+            else:
+                f = pygame.font.SysFont(font, size)
+            self.fonts[key] = f
+        return f
+
+    def render(self, font, size, text, color, antialias=True):
+        key = (font, size, text, tuple(color), antialias)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = self.get_font(font, size).render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "surfaces": len(self.surfaces),
+            "fonts": len(self.fonts),
+        }
+
+    def clear(self):
+        # fonts are only valid while pygame.font is initialized, so drop them too
+        self.fonts.clear()
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_cache = TextCache()
+
+
+def get_font(font, size):
+    return _cache.get_font(font, size)
+
+
+def render(font, size, text, color, antialias=True):
+    return _cache.render(font, size, text, color, antialias)
+
+
+def stats():
+    return _cache.stats()
+
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,68 @@
+import time
+
+# Non-blocking animation scheduler.
+# A tween runs for a fixed duration (after an optional delay); every tick()
+# from the game loop calls its update(t) with t going from 0 to 1, and done()
+# once it finishes. Any number of tweens run at once and none of them waits,
+# so the loop keeps pumping events while they play. The clock is injectable
+# (milliseconds), e.g. pygame.time.get_ticks in a game or a fake clock when
+# driving the scheduler headlessly.
+
+
+def default_clock():
+    return time.perf_counter() * 1000
+
+
+class Tween:
+    def __init__(self, start, duration, update, done, tag):
+        self.start = start
+        self.duration = duration
+        self.update = update
+        self.done = done
+        self.tag = tag
+
+    def progress(self, now):
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, (now - self.start) / self.duration)
+
+
+class Scheduler:
+    def __init__(self, clock=default_clock):
+        self.clock = clock
+        self.tweens = []
+
+    def add(self, duration, update=None, done=None, delay=0, tag=None):
+        # without update this is a plain timer that calls done after delay + duration
+        tween = Tween(self.clock() + delay, duration, update, done, tag)
+        self.tweens.append(tween)
+        return tween
+
+    def cancel(self, tag, finish=False):
+        # drop the tweens with tag; finish=True jumps them to t=1 and calls done first
+        for tween in [tw for tw in self.tweens if tw.tag == tag]:
+            self.tweens.remove(tween)
+            if finish:
+                if tween.update:
+                    tween.update(1.0)
+                if tween.done:
+                    tween.done()
+
+    def busy(self, tag=None):
+        # True while a tween (with tag) is waiting or running
+        return any(tag is None or tween.tag == tag for tween in self.tweens)
+
+    def tick(self):
+        # tweens added by an update or done callback start on the next tick
+        now = self.clock()
+        for tween in list(self.tweens):
+            if now < tween.start or tween not in self.tweens:
+                continue
+            t = tween.progress(now)
+            if tween.update:
+                tween.update(t)
+            if t >= 1.0:
+                self.tweens.remove(tween)
+                if tween.done:
+                    tween.done()
+